@@ -1,5 +1,9 @@
+import time
 import cv2
-from cvzone.HandTrackingModule import HandDetector
+from panel_renderer import blend_sprite, rasterize
+from calc_engine import CalcError, evaluate, format_result
+from gestures import GestureEngine
+from hand_worker import HandInferenceWorker
 
 
 class Button:
@@ -36,69 +40,87 @@ for y in range(4):
         ypos = y * 100 + 150
         buttonList.append(Button((xpos, ypos), 100, 100, buttonListValues[y][x]))
 
-# Variables
-myEquation = ''
-delayCounter = 0
 
-# Webcam Setup
-cap = cv2.VideoCapture(0)
-cap.set(3, 1280)  # Width
-cap.set(4, 720)   # Height
-detector = HandDetector(detectionCon=0.8, maxHands=1)
-
-while True:
-    success, img = cap.read()
-    img = cv2.flip(img, 1)
-    hands, img = detector.findHands(img, flipType=False)
-
-    alpha = 0.5  # Transparency level (0 = fully transparent, 1 = fully opaque)
-
-# Create a copy of the original image
-    overlay = img.copy()
-
-    # Draw UI
+def drawKeypad(img):
     cv2.rectangle(img, (50, 50), (450, 150), (225, 225, 225), cv2.FILLED)
     cv2.rectangle(img, (50, 50), (450, 150), (50, 50, 50),3)
-    # cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
     for button in buttonList:
         button.draw(img)
 
-    # Check for Hand
-    if hands:
-        lmList = hands[0]['lmList']
-        if len(lmList) >= 12:
-            x1, y1, _ = lmList[8]
-            x2, y2, _ = lmList[12]
-            length, _, img = detector.findDistance((x1, y1), (x2, y2), img)
-           # print(length)
 
-            if length < 50 and delayCounter == 0:
+# The keypad never changes: render it once and copy it into each frame
+keypadSprite = rasterize(drawKeypad, 460, 560)
+
+def drawPinch(img, p1, p2):
+    # The pinch marker cvzone's findDistance used to draw
+    cx, cy = (p1[0] + p2[0]) // 2, (p1[1] + p2[1]) // 2
+    cv2.circle(img, p1, 15, (255, 0, 255), cv2.FILLED)
+    cv2.circle(img, p2, 15, (255, 0, 255), cv2.FILLED)
+    cv2.line(img, p1, p2, (255, 0, 255), 3)
+    cv2.circle(img, (cx, cy), 15, (255, 0, 255), cv2.FILLED)
+
+
+def main():
+    # Variables
+    myEquation = ''
+    # Index/middle fingertip pinch, filtered and thresholded relative to the palm size
+    gestures = GestureEngine(pinch=(8, 12), pointer=8, press_ratio=0.28, release_ratio=0.38)
+
+    # Webcam Setup
+    cap = cv2.VideoCapture(0)
+    cap.set(3, 1280)  # Width
+    cap.set(4, 720)   # Height
+    # Mediapipe hand tracking runs in a worker process; frames go over shared memory
+    detector = HandInferenceWorker(max_hands=1, detection_con=0.8)
+
+    while True:
+        success, img = cap.read()
+        if not success:
+            break
+        img = cv2.flip(img, 1)
+        hands, img = detector.findHands(img, flipType=False)
+
+        # Draw UI
+        blend_sprite(img, keypadSprite, 0, 0)
+
+        # Check for Hand
+        hand = hands[0] if hands and len(hands[0]['lmList']) >= 12 else None
+        events = gestures.update(hand, time.time())
+        if hand is not None:
+            x1, y1 = (int(v) for v in gestures.landmarks[8])
+            x2, y2 = (int(v) for v in gestures.landmarks[12])
+            drawPinch(img, (x1, y1), (x2, y2))
+
+            # One click per pinch: the fingers must open past the release threshold first
+            if any(event.kind == "press" for event in events):
                 for button in buttonList:
                     if button.checkClick(x1, y1):
                         myValue = button.value
                         if myValue == '=':
                             try:
-                                myEquation = str(eval(myEquation))
-                            except:
+                                myEquation = format_result(evaluate(myEquation))
+                            except CalcError:
                                 myEquation = 'Error'
                         else:
                             myEquation += myValue
-                        delayCounter = 1
 
-    # Prevent multiple clicks
-    if delayCounter != 0:
-        delayCounter += 1
-        if delayCounter > 10:
-            delayCounter = 0
+        # Display equation
+        cv2.putText(img, myEquation, (60, 120), cv2.FONT_HERSHEY_PLAIN, 3, (0, 0, 0), 3)
+
+        # Show frame
+        cv2.imshow("Calculator", img)
+        key = cv2.waitKey(1)
+
+        if key == ord('c'):
+            myEquation = ''
+        elif key == ord("x"):
+            break
 
-    # Display equation
-    cv2.putText(img, myEquation, (60, 120), cv2.FONT_HERSHEY_PLAIN, 3, (0, 0, 0), 3)
+    cap.release()
+    detector.close()
+    cv2.destroyAllWindows()
 
-    # Show frame
-    cv2.imshow("Calculator",img)
-    key = cv2.waitKey(1)
 
-    if key== ord('c'):
-        myEquation = ''
-    elif key == ord("x"):
-        break
+# Guarded, because the hand worker process imports this module
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from calc_engine import CalcError, evaluate, format_result
+from worker_utils import ignore_interrupts, worker_context
+
+
+def _limit_memory(budget):
+    # Allow `budget` bytes on top of what the freshly started worker already maps
+    if resource is None or not budget:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            used = int(f.read().split()[0]) * resource.getpagesize()
+    except OSError:
+        used = 0
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (used + budget, used + budget))
+    except (ValueError, OSError):
+        pass
+
+
+def _serve(conn, memory_limit):
+    ignore_interrupts()
+    _limit_memory(memory_limit)
+    conn.send("ready")
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        job_id, text = job
+        try:
+            conn.send((job_id, format_result(evaluate(text)), None))
+        except CalcError as e:
+            conn.send((job_id, None, str(e)))
+        except MemoryError:
+            conn.send((job_id, None, "out of memory"))
+
+
+class AsyncEvaluator:
+    """Evaluates expressions in a worker process so the caller never blocks.
+
+    submit() hands the input to the worker and poll() returns the result once
+    it is back. A job that runs longer than `timeout` seconds gets the worker
+    killed and restarted and is reported as "Error"; the worker's address
+    space is capped at `memory_limit` extra bytes where the OS supports it.
+    """
+
+    worker = staticmethod(_serve)
+
+    def __init__(self, timeout=1.0, memory_limit=256 * 1024 * 1024):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.ctx = worker_context()
+        self.process = None
+        self.conn = None
+        self.ready_at = None
+        self.next_id = 0
+        self.pending_id = None
+        self.sent_at = 0.0
+        self.timeouts = 0
+        self._start()
+
+    def _start(self):
+        parent, child = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=self.worker, args=(child, self.memory_limit),
+                                        name="calc-eval", daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.ready_at = None
+
+    def _restart(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self._start()
+
+    @property
+    def pending(self):
+        return self.pending_id is not None
+
+    def submit(self, text):
+        """Queue text for evaluation; supersedes any job still in flight."""
+        self.next_id += 1
+        self.pending_id = self.next_id
+        self.sent_at = time.monotonic()
+        self.conn.send((self.pending_id, text))
+        return self.pending_id
+
+    def cancel(self):
+        # A late result for a cancelled job is ignored by poll()
+        self.pending_id = None
+
+    def poll(self):
+        """Result text of the latest job once it is ready, otherwise None."""
+        now = time.monotonic()
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message == "ready":
+                    self.ready_at = now
+                    continue
+                job_id, value, error = message
+                if job_id == self.pending_id:
+                    self.pending_id = None
+                    return "Error" if error is not None else value
+        except (EOFError, OSError):
+            # Worker died, e.g. killed by the OS for its memory use
+            self._restart()
+            return self._fail()
+
+        if self.pending_id is None or self.ready_at is None:
+            return None
+        if now - max(self.sent_at, self.ready_at) > self.timeout:
+            self.timeouts += 1
+            self._restart()
+            return self._fail()
+        return None
+
+    def _fail(self):
+        if self.pending_id is None:
+            return None
+        self.pending_id = None
+        return "Error"
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+from cv2 import aruco
+
+from button_layout import FIRST_KEY, HOVER
+from calc_engine import evaluate
+from hand_utils import make_hand
+from main import ARCalculator, WebcamStream
+from pipeline import NO_FRAME
+from profiler import LatencyHistogram
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# Metrics that depend on OS scheduling get twice the regression tolerance
+NOISY = ("calculate_result_us", "loop_threaded_age_ms", "loop_sync_age_ms")
+
+
+class SyntheticCamera:
+    """Camera stand-in that renders a moving ArUco marker on a fixed clock.
+
+    Frame k is exposed at start + k / fps. read() waits for the next frame
+    like a real device, and like a driver queue it keeps at most `buffered`
+    frames, so a slow reader gets stale frames rather than the newest one.
+    Markers are drawn mirrored because the app flips every frame.
+    """
+
+    def __init__(self, width=640, height=480, fps=60, buffered=4, marker_id=0, marker_size=110):
+        self.width, self.height = width, height
+        self.fps = fps
+        self.buffered = buffered
+        dictionary = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
+        marker = cv2.flip(aruco.generateImageMarker(dictionary, marker_id, marker_size), 1)
+        self.marker = cv2.cvtColor(marker, cv2.COLOR_GRAY2BGR)
+        rng = np.random.default_rng(0)
+        self.background = rng.integers(150, 210, (height, width, 3), dtype=np.uint8)
+        self.start = None
+        self.next_index = 0
+        self.timestamp = None
+
+    def marker_position(self, index):
+        # Slow drift so the marker tracker has motion to follow
+        t = index / self.fps
+        x = int(self.width * 0.55 + 40 * np.sin(t * 0.9))
+        y = int(self.height * 0.12 + 15 * np.sin(t * 1.3))
+        return x, y
+
+    def read(self, image=None):
+        now = time.time()
+        if self.start is None:
+            self.start = now
+        newest = int((now - self.start) * self.fps)
+        # Frames older than the driver queue have been overwritten
+        index = max(self.next_index, newest - self.buffered + 1)
+        capture_time = self.start + index / self.fps
+        if capture_time > now:
+            time.sleep(capture_time - now)
+        self.next_index = index + 1
+        self.timestamp = capture_time
+
+        frame = image if image is not None and image.shape == self.background.shape else self.background.copy()
+        if frame is image:
+            np.copyto(frame, self.background)
+        x, y = self.marker_position(index)
+        size = self.marker.shape[0]
+        # White quiet zone around the marker
+        cv2.rectangle(frame, (x - 12, y - 12), (x + size + 11, y + size + 11), (255, 255, 255), -1)
+        frame[y:y + size, x:x + size] = self.marker
+        return True, frame
+
+    def release(self):
+        pass
+
+
+class DirectStream:
+    """Synchronous capture as in detectAruco.py: the loop itself calls read()."""
+
+    live = True
+
+    def __init__(self, camera):
+        self.camera = camera
+        self.seq = -1
+        self.timestamp = None
+
+    def start(self):
+        return self
+
+    def read(self):
+        ret, frame = self.camera.read()
+        self.seq += 1
+        self.timestamp = self.camera.timestamp
+        return ret, frame
+
+    def stop(self):
+        self.camera.release()
+
+
+class SyntheticHands:
+    """findHands() stand-in that follows a scripted fingertip track.
+
+    The index fingertip traces a Lissajous curve over the display, and the
+    thumb pinches it every `pinch_period` frames, so hover, press and slide
+    paths are all exercised without a hand model.
+    """
+
+    def __init__(self, width=800, height=600, pinch_period=20):
+        self.width, self.height = width, height
+        self.pinch_period = pinch_period
+        self.frame = 0
+
+    def fingertips(self, n):
+        t = n * 0.05
+        index = np.float32([self.width * (0.5 + 0.35 * np.sin(1.7 * t)),
+                            self.height * (0.5 + 0.35 * np.sin(2.3 * t + 0.5))])
+        pinching = n % self.pinch_period < self.pinch_period // 4
+        thumb = index + (np.float32([8, 8]) if pinching else np.float32([60, 40]))
+        return index, thumb
+
+    def findHands(self, img, draw=True, flipType=True):
+        index, thumb = self.fingertips(self.frame)
+        self.frame += 1
+        # Wrist below the finger and a palm about 110 px long
+        landmarks = np.repeat((index + np.float32([10, 150]))[None], 21, axis=0)
+        landmarks[9:21] = index + np.float32([10, 40])
+        landmarks[5:9] = index
+        landmarks[1:5] = thumb
+        hands = [make_hand(landmarks, "Right")]
+        return (hands, img) if draw else hands
+
+
+def time_calls(fn, iterations, repeats=5):
+    """Best over repeats of the mean time per call, in microseconds."""
+    results = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(iterations):
+            fn(i)
+        results.append((time.perf_counter() - start) / iterations * 1e6)
+    return min(results)
+
+
+def micro_benchmarks(calc):
+    metrics = {}
+    anchor = np.float32([420, 60])
+    session = calc.session(0)
+    session.ui_visibility = 1.0
+    layout = calc.get_button_coords(anchor)
+    key_centers = [((b["x1"] + b["x2"]) / 2, (b["y1"] + b["y2"]) / 2) for b in layout.buttons[FIRST_KEY:]]
+    jitter = np.random.default_rng(1).uniform(-3, 3, (256, 2)).astype(np.float32)
+
+    # Anchor jitter, as from frame-to-frame marker noise
+    metrics["get_button_coords_us"] = time_calls(
+        lambda i: calc.get_button_coords(anchor + jitter[i % 256]), 2000)
+
+    safe_keys = [c for c, label in zip(key_centers, layout.labels[FIRST_KEY:]) if label not in "=C"]
+
+    def press(i):
+        if len(session.current_input) > 15:
+            session.current_input = ""
+        session.detect_button_press(safe_keys[i % len(safe_keys)])
+    metrics["detect_button_press_us"] = time_calls(press, 2000)
+    session.current_input = ""
+
+    def slide(i):
+        session.is_sliding = True
+        session.update_slider_position(400 + (i % 50))
+    metrics["update_slider_position_us"] = time_calls(slide, 5000)
+    session.is_sliding = False
+    session.ui_visibility = 1.0
+
+    frame = np.full((600, 800, 3), 180, np.uint8)
+    inputs = ["", "12", "12+3", "12+34*5"]
+
+    def draw(i):
+        layout = calc.get_button_coords(anchor)
+        # The fingertip hovers each key for a few frames; typing changes the display now and then
+        layout.states[FIRST_KEY + (i // 5) % (len(layout.labels) - FIRST_KEY)] = HOVER
+        session.current_input = inputs[(i // 100) % len(inputs)]
+        calc.draw_ui(frame, session)
+    metrics["draw_ui_us"] = time_calls(draw, 500)
+    session.current_input = ""
+
+    def calculate(i):
+        # Round trip through the evaluation worker, as the UI sees it
+        session.current_input = f"({i}+3)*7/2-{i % 13}**2"
+        session.calculate_result()
+        while session.evaluating:
+            calc.poll_result()
+    metrics["calculate_result_us"] = time_calls(calculate, 200)
+    metrics["evaluate_us"] = time_calls(lambda i: evaluate(f"{i}*({i}+3)/7-2**3"), 2000, repeats=1)
+    session.current_input = session.current_result = ""
+    return metrics
+
+
+def loop_benchmark(calc, stream, duration):
+    """Run capture → preprocess → detect → render → show; returns (fps, frame age p50 ms)."""
+    calc.views[0].stream = stream.start()
+    calc.session(0).ui_visibility = 1.0
+    ages = LatencyHistogram()
+    frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        packet = calc.capture()
+        if packet is None:
+            break
+        if packet is NO_FRAME:
+            continue
+        packet = calc.show(calc.render(calc.detect(calc.preprocess(packet))))
+        ages.record(time.time() - packet["captured"])
+        frames += 1
+    elapsed = time.perf_counter() - start
+    stream.stop()
+    return frames / elapsed, ages.percentiles((0.5,))[0] * 1e3
+
+
+def run_benchmarks(duration=3.0, camera_fps=90):
+    hands = SyntheticHands()
+    calc = ARCalculator(DirectStream(SyntheticCamera(fps=camera_fps)), headless=True, hand_detector=hands)
+    try:
+        metrics = micro_benchmarks(calc)
+        fps, age = loop_benchmark(calc, WebcamStream(SyntheticCamera(fps=camera_fps)), duration)
+        metrics["loop_threaded_fps"], metrics["loop_threaded_age_ms"] = fps, age
+        fps, age = loop_benchmark(calc, DirectStream(SyntheticCamera(fps=camera_fps)), duration)
+        metrics["loop_sync_fps"], metrics["loop_sync_age_ms"] = fps, age
+    finally:
+        calc.views[0].detector.close()
+        calc.evaluator.close()
+    return metrics
+
+
+def higher_is_better(name):
+    return name.endswith("_fps")
+
+
+def compare(metrics, baseline, tolerance):
+    """Print metrics next to the baseline; returns the names that regressed.
+
+    A metric regresses when it is worse than its baseline by more than the
+    tolerance (a fraction), or twice that for the NOISY metrics.
+    """
+    regressions = []
+    print(f"{'metric':<28}{'value':>12}{'baseline':>12}{'change':>9}")
+    for name, value in metrics.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28}{value:12.2f}{'-':>12}")
+            continue
+        change = (value - base) / base if base else 0.0
+        worse = -change if higher_is_better(name) else change
+        flag = ""
+        if worse > (2 * tolerance if name in NOISY else tolerance):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28}{value:12.2f}{base:12.2f}{change:+8.0%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Headless ARCalculator benchmarks; no camera or display is needed")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file to compare against")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run's numbers as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per end-to-end loop run")
+    parser.add_argument("--camera-fps", type=float, default=90,
+                        help="frame rate of the synthetic camera; above the loop rate, so the driver queue fills")
+    parser.add_argument("--json", help="also write this run's metrics to this file")
+    args = parser.parse_args()
+
+    metrics = run_benchmarks(args.duration, args.camera_fps)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(metrics, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": f"{platform.machine()} {platform.system()} python {platform.python_version()}",
+                       "tolerance": 0.3 if args.tolerance is None else args.tolerance,
+                       "metrics": {name: round(value, 3) for name, value in metrics.items()}}, f, indent=2)
+            f.write("\n")
+        compare(metrics, {}, 0)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        compare(metrics, {}, 0)
+        print("No baseline yet; run with --update-baseline to store one")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        stored = json.load(f)
+    tolerance = stored.get("tolerance", 0.3) if args.tolerance is None else args.tolerance
+    regressions = compare(metrics, stored["metrics"], tolerance)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"No regressions beyond {tolerance:.0%}")
@@ -0,0 +1,120 @@
+import numpy as np
+
+# Fixed record order: slider, display box, then the keys row by row
+SLIDER, DISPLAY, FIRST_KEY = 0, 1, 2
+
+STATE_NAMES = ("normal", "hover", "pressed", "display")
+NORMAL, HOVER, PRESSED, DISPLAY_STATE = range(4)
+
+BUTTON_DTYPE = np.dtype([
+    ("label", "U8"),
+    ("x1", np.int32), ("y1", np.int32),
+    ("x2", np.int32), ("y2", np.int32),
+])
+
+
+class ButtonLayout:
+    """Calculator button rectangles held in a NumPy structured array.
+
+    The array is rebuilt only when the quantized anchor or ui_visibility
+    changes, and hit-testing is a constant-time grid computation instead of
+    a scan over per-frame button dicts.
+    """
+
+    def __init__(self, button_labels, button_width, button_height, button_spacing,
+                 display_height, slider_width, quantum=2):
+        self.rows = len(button_labels)
+        self.cols = len(button_labels[0])
+        self.button_width = button_width
+        self.button_height = button_height
+        self.pitch_x = button_width + button_spacing
+        self.pitch_y = button_height + button_spacing
+        self.button_spacing = button_spacing
+        self.display_height = display_height
+        self.slider_width = slider_width
+        self.total_width = self.cols * button_width + (self.cols - 1) * button_spacing
+        self.quantum = quantum  # Anchor jitter below this many pixels doesn't relayout
+
+        self.buttons = np.zeros(FIRST_KEY + self.rows * self.cols, BUTTON_DTYPE)
+        self.buttons["label"][:FIRST_KEY] = ("slider", "display")
+        self.buttons["label"][FIRST_KEY:] = [label for row in button_labels for label in row]
+        self.labels = self.buttons["label"].tolist()
+        self.states = np.zeros(len(self.buttons), np.uint8)
+        self.states[DISPLAY] = DISPLAY_STATE
+        self.count = 0  # 1 when only the slider is visible
+        self.key = None
+        self.relayouts = 0
+
+    def __len__(self):
+        return self.count
+
+    def update(self, ui_top_left, ui_visibility):
+        """Position the layout; returns True when the rectangles were recomputed."""
+        self.states[FIRST_KEY:] = NORMAL
+        qx = int(round(float(ui_top_left[0]) / self.quantum))
+        qy = int(round(float(ui_top_left[1]) / self.quantum))
+        key = (qx, qy, ui_visibility)
+        if key == self.key:
+            return False
+        self.key = key
+        self.relayouts += 1
+        left, top = qx * self.quantum, qy * self.quantum
+
+        slider_x = int(left + self.total_width * ui_visibility)
+        panel_height = self.display_height + self.rows * self.pitch_y
+        self.slider_rect = (slider_x, top, slider_x + self.slider_width, top + panel_height)
+        self.buttons[SLIDER] = ("slider",) + self.slider_rect
+
+        if ui_visibility > 0:
+            display_x = int(left - self.total_width * (1 - ui_visibility))
+            self.display_rect = (display_x, top, display_x + self.total_width, top + self.display_height)
+            self.buttons[DISPLAY] = ("display",) + self.display_rect
+
+            # Keys form a regular grid below the display box
+            self.grid_x = display_x
+            self.grid_y = top + self.display_height + self.button_spacing
+            cols = np.tile(np.arange(self.cols), self.rows)
+            rows = np.repeat(np.arange(self.rows), self.cols)
+            keys = self.buttons[FIRST_KEY:]
+            keys["x1"] = self.grid_x + cols * self.pitch_x
+            keys["y1"] = self.grid_y + rows * self.pitch_y
+            keys["x2"] = keys["x1"] + self.button_width
+            keys["y2"] = keys["y1"] + self.button_height
+            self.count = len(self.buttons)
+        else:
+            self.count = 1
+        return True
+
+    def hit_test(self, x, y):
+        """Index of the button under (x, y), or -1. Edges are inclusive."""
+        if self.count == 0:
+            return -1
+        x1, y1, x2, y2 = self.slider_rect
+        if x1 <= x <= x2 and y1 <= y <= y2:
+            return SLIDER
+        if self.count == 1:
+            return -1
+        x1, y1, x2, y2 = self.display_rect
+        if x1 <= x <= x2 and y1 <= y <= y2:
+            return DISPLAY
+        dx, dy = x - self.grid_x, y - self.grid_y
+        if dx < 0 or dy < 0:
+            return -1
+        col, rx = divmod(dx, self.pitch_x)
+        row, ry = divmod(dy, self.pitch_y)
+        if col >= self.cols or row >= self.rows or rx > self.button_width or ry > self.button_height:
+            return -1
+        return FIRST_KEY + int(row) * self.cols + int(col)
+
+    def state(self, index):
+        return STATE_NAMES[self.states[index]]
+
+    def as_dicts(self):
+        """The visible buttons in the dict form the drawing code uses."""
+        return [{
+            "label": self.labels[i],
+            "x1": int(b["x1"]), "y1": int(b["y1"]),
+            "x2": int(b["x2"]), "y2": int(b["y2"]),
+            "state": STATE_NAMES[self.states[i]],
+            "is_slider": i == SLIDER,
+        } for i, b in enumerate(self.buttons[:self.count])]
@@ -0,0 +1,292 @@
+import math
+import operator
+from functools import lru_cache
+
+# Integers are capped so no keypad input can stall the caller; 4000 digits
+# also stays under Python's default int-to-str conversion limit.
+MAX_DIGITS = 4000
+MAX_BITS = int(MAX_DIGITS * math.log2(10))
+
+
+class CalcError(Exception):
+    pass
+
+
+def _check(value):
+    if isinstance(value, int) and value.bit_length() > MAX_BITS:
+        raise CalcError("result too large")
+    return value
+
+
+def _power(base, exponent):
+    # Estimate the size of integer powers before computing them (9**9**9)
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * math.log10(abs(base)) > MAX_DIGITS:
+            raise CalcError("result too large")
+    return operator.pow(base, exponent)
+
+
+# Python precedence: ** binds tighter than unary minus, which binds tighter than * / //
+BINARY = {
+    "+": (1, operator.add),
+    "-": (1, operator.sub),
+    "*": (2, operator.mul),
+    "/": (2, operator.truediv),
+    "//": (2, operator.floordiv),
+    "**": (4, _power),
+}
+UNARY = {
+    "neg": (3, operator.neg),
+    "pos": (3, operator.pos),
+}
+RIGHT_ASSOC = {"**"}
+DIGITS = "0123456789."
+
+
+def _apply(values, op):
+    try:
+        if op in UNARY:
+            return values[:-1] + (_check(UNARY[op][1](values[-1])),)
+        return values[:-2] + (_check(BINARY[op][1](values[-2], values[-1])),)
+    except CalcError:
+        raise
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise CalcError(str(e)) from e
+
+
+def run(code):
+    """Execute compiled bytecode: ("push", value) or ("op", name) instructions in RPN order."""
+    values = ()
+    for kind, arg in code:
+        values = values + (arg,) if kind == "push" else _apply(values, arg)
+    if len(values) != 1:
+        raise CalcError("malformed bytecode")
+    return values[0]
+
+
+class _State:
+    """Parser state after some prefix of the input. Never mutated, so prefixes share it."""
+
+    __slots__ = ("code", "values", "ops", "number", "expect", "error", "last")
+
+    def __init__(self, code=None, values=(), ops=(), number="", expect=True, error=None, last=""):
+        self.code = code  # emitted instructions as a linked list: (instruction, previous)
+        self.values = values  # value stack when evaluating eagerly
+        self.ops = ops  # pending operators and "(" markers
+        self.number = number  # digits of the literal being typed
+        self.expect = expect  # True when an operand must come next
+        self.error = error
+        self.last = last  # previous input character
+
+    def replace(self, **changes):
+        state = _State(self.code, self.values, self.ops, self.number, self.expect, self.error, self.last)
+        for name, value in changes.items():
+            setattr(state, name, value)
+        return state
+
+
+def _emit(state, instruction, eager):
+    values = state.values
+    if eager:
+        try:
+            values = values + (instruction[1],) if instruction[0] == "push" else _apply(values, instruction[1])
+        except CalcError as e:
+            return state.replace(error=str(e))
+    return state.replace(code=(instruction, state.code), values=values)
+
+
+def _flush_number(state, eager):
+    if not state.number:
+        return state
+    literal = state.number
+    if literal == ".":
+        return state.replace(error="invalid number")
+    if "." in literal:
+        value = float(literal)
+    elif len(literal) > 1 and literal[0] == "0" and literal.strip("0"):
+        return state.replace(error="leading zeros in integer")
+    else:
+        value = int(literal)
+    return _emit(state.replace(number=""), ("push", value), eager)
+
+
+def _push_binary(state, op, eager):
+    precedence = BINARY[op][0]
+    ops = state.ops
+    while ops and ops[-1] != "(" and state.error is None:
+        top = ops[-1]
+        top_precedence = UNARY[top][0] if top in UNARY else BINARY[top][0]
+        if top_precedence > precedence or (top_precedence == precedence and op not in RIGHT_ASSOC):
+            state = _emit(state, ("op", top), eager)
+            ops = ops[:-1]
+        else:
+            break
+    return state.replace(ops=ops + (op,), expect=True)
+
+
+def _feed(states, ch, eager):
+    """State after appending ch to the input that produced states[-1]."""
+    state = states[-1]
+    if state.error is not None:
+        return state.replace(last=ch)
+
+    if ch in DIGITS:
+        if not state.expect and not state.number:
+            state = state.replace(error="missing operator")
+        elif ch == "." and "." in state.number:
+            state = state.replace(error="invalid number")
+        else:
+            state = state.replace(number=state.number + ch, expect=False)
+
+    elif ch in "+-*/":
+        if (ch in "*/" and state.last == ch and state.expect
+                and state.ops and state.ops[-1] == ch and len(states) > 1):
+            # Second '*' or '/' in a row: re-apply '**' or '//' to the state before the first
+            state = _flush_number(states[-2], eager)
+            if state.error is None:
+                state = _push_binary(state, ch * 2, eager)
+        else:
+            state = _flush_number(state, eager)
+            if state.error is not None:
+                pass
+            elif not state.expect:
+                state = _push_binary(state, ch, eager)
+            elif ch in "+-":
+                state = state.replace(ops=state.ops + ("neg" if ch == "-" else "pos",))
+            else:
+                state = state.replace(error="missing operand")
+
+    elif ch in " \t":
+        # Whitespace only separates tokens ("1 2" is still an error)
+        state = _flush_number(state, eager)
+
+    elif ch == "(":
+        if not state.expect:
+            state = state.replace(error="missing operator")
+        else:
+            state = state.replace(ops=state.ops + ("(",))
+
+    elif ch == ")":
+        state = _flush_number(state, eager)
+        if state.error is None and state.expect:
+            state = state.replace(error="missing operand")
+        ops = state.ops
+        while state.error is None:
+            if not ops:
+                state = state.replace(error="unmatched ')'")
+            elif ops[-1] == "(":
+                state = state.replace(ops=ops[:-1], expect=False)
+                break
+            else:
+                state = _emit(state, ("op", ops[-1]), eager)
+                ops = ops[:-1]
+
+    else:
+        state = state.replace(error=f"unexpected {ch!r}")
+
+    return state.replace(last=ch)
+
+
+def _finish(state, eager, strict):
+    """Close the expression. Non-strict mode previews unfinished input."""
+    state = _flush_number(state, eager)
+    ops = state.ops
+    if state.error is None and state.expect:
+        if strict:
+            return state.replace(error="incomplete expression")
+        # Drop a trailing operator or open parenthesis ("2+3*" previews as 5)
+        expect = True
+        while expect and ops:
+            if ops[-1] in BINARY:
+                expect = False
+            ops = ops[:-1]
+        if expect:
+            return state.replace(error="empty expression")
+    while ops and state.error is None:
+        if ops[-1] == "(":
+            if strict:
+                return state.replace(error="unclosed '('")
+        else:
+            state = _emit(state, ("op", ops[-1]), eager)
+        ops = ops[:-1]
+    return state.replace(ops=())
+
+
+def _code(state):
+    code = []
+    node = state.code
+    while node is not None:
+        code.append(node[0])
+        node = node[1]
+    return tuple(reversed(code))
+
+
+@lru_cache(maxsize=256)
+def _compile(text):
+    states = [_State()]
+    for ch in text:
+        states.append(_feed(states, ch, eager=False))
+    state = _finish(states[-1], eager=False, strict=True)
+    return (None, state.error) if state.error is not None else (_code(state), None)
+
+
+def compile_expression(text):
+    """Parse keypad input into bytecode; raises CalcError on a syntax error."""
+    code, error = _compile(text)
+    if error is not None:
+        raise CalcError(error)
+    return code
+
+
+@lru_cache(maxsize=256)
+def _evaluate(text):
+    try:
+        return run(compile_expression(text)), None
+    except CalcError as e:
+        return None, str(e)
+
+
+def evaluate(text):
+    """Value of a keypad expression, with the same result eval() would give."""
+    value, error = _evaluate(text)
+    if error is not None:
+        raise CalcError(error)
+    return value
+
+
+def format_result(value):
+    return str(value)
+
+
+class LiveEvaluator:
+    """Evaluates the input incrementally as keys are appended or removed.
+
+    One parser state is kept per input prefix, so appending a key costs one
+    parser step and backspace is a pop; update() resyncs from the longest
+    common prefix if the input was changed some other way.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.states = [_State()]
+        self._preview = ""
+
+    def update(self, text):
+        if text == self.text:
+            return
+        common = 0
+        limit = min(len(text), len(self.text))
+        while common < limit and text[common] == self.text[common]:
+            common += 1
+        del self.states[common + 1:]
+        for ch in text[common:]:
+            self.states.append(_feed(self.states, ch, eager=True))
+        self.text = text
+        state = _finish(self.states[-1], eager=True, strict=False)
+        self._preview = format_result(state.values[-1]) if state.error is None and state.values else ""
+
+    def preview(self, text=None):
+        """Result of the input so far, ignoring a trailing operator; "" if there is none."""
+        if text is not None:
+            self.update(text)
+        return self._preview
@@ -1,4 +1,5 @@
 import tkinter as tk;
+from calc_engine import CalcError, evaluate, format_result
 
 # Function to update the display
 def button_click(value):
@@ -9,10 +10,10 @@ def button_click(value):
 # Function to evaluate the expression in the display
 def calculate():
     try:
-        result = eval(display.get())
+        result = format_result(evaluate(display.get()))
         display.delete(0, tk.END)
         display.insert(tk.END, result)
-    except Exception as e:
+    except CalcError:
         display.delete(0, tk.END)
         display.insert(tk.END, "Error")
 
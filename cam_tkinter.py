@@ -1,6 +1,6 @@
 import cv2
 import tkinter as tk
-from PIL import Image, ImageTk
+from tk_video import FrameFeed, VideoLabel
 
 # Initialize Tkinter window
 root = tk.Tk()
@@ -17,26 +17,12 @@ cap = cv2.VideoCapture(0)  # 0 for default webcam
 video_frame = tk.Frame(root, width=WIDTH, height=HEIGHT)
 video_frame.grid(row=0, column=0, columnspan=4)  # Span across columns for overlay
 
-# Create a Label to Display Video
-video_label = tk.Label(video_frame)
+# Create a Label to Display Video; one PhotoImage, resized and redrawn in place per frame
+video_label = VideoLabel(video_frame, WIDTH, HEIGHT)
 video_label.pack(fill="both", expand=True)
 
-def update_frame():
-    """Captures frame, converts it, and updates the GUI."""
-    ret, frame = cap.read()
-    if ret:
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.resize(frame, (WIDTH, HEIGHT))  # Resize to fit the window
-        
-        # Convert frame to ImageTk format
-        img = Image.fromarray(frame)
-        imgtk = ImageTk.PhotoImage(image=img)
-        
-        # Update label with the new image
-        video_label.imgtk = imgtk
-        video_label.configure(image=imgtk)
-    
-    root.after(10, update_frame)  # Refresh every 10ms
+# Frames are read on a background thread and drawn as they arrive, instead of polling
+feed = FrameFeed(cap, video_label.submit)
 
 # Create a Frame for Calculator Buttons
 button_frame = tk.Frame(root, bg="white")
@@ -65,14 +51,14 @@ for (text, row, col) in buttons:
 
 # Close the webcam properly when the window is closed
 def on_closing():
-    cap.release()
+    feed.stop()  # releases the webcam once the last read returns
     cv2.destroyAllWindows()
     root.destroy()
 
 root.protocol("WM_DELETE_WINDOW", on_closing)
 
 # Start updating the frames
-update_frame()
+feed.start()
 
 # Run Tkinter event loop
 root.mainloop()
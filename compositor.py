@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class QuadCompositor:
+    """Blends images into frames so their corners land on an arbitrary quad.
+
+    Only the quad's bounding box is warped and blended, so the cost follows
+    the size of the overlay on screen rather than the frame size. The blend
+    weights come from warping a constant-opacity mask alongside the image,
+    so edges are antialiased and dark image pixels still count as covered.
+    Those masks are kept in a small LRU owned by the compositor.
+    """
+
+    def __init__(self, cache_size=8):
+        self.cache_size = cache_size
+        self.masks = OrderedDict()  # (h, w, opacity) -> float32 mask
+
+    def _mask(self, h, w, opacity):
+        key = (h, w, opacity)
+        mask = self.masks.get(key)
+        if mask is None:
+            mask = self.masks[key] = np.full((h, w), opacity, np.float32)
+            if len(self.masks) > self.cache_size:
+                self.masks.popitem(last=False)
+        else:
+            self.masks.move_to_end(key)
+        return mask
+
+    def blend(self, frame, image, quad, opacity=1.0):
+        """Blend image into frame in place onto quad (4 points, clockwise from top-left)."""
+        quad = np.asarray(quad, dtype=np.float32).reshape(4, 2)
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = np.floor(quad.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(quad.max(axis=0)).astype(int) + 1
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, frame_w), min(y1, frame_h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        h, w = image.shape[:2]
+        src = np.float32([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]])
+        # The ROI offset is folded into the transform, so warping writes only the ROI
+        matrix = cv2.getPerspectiveTransform(src, quad - np.float32([x0, y0]))
+        size = (x1 - x0, y1 - y0)
+        warped = cv2.warpPerspective(image, matrix, size, flags=cv2.INTER_LINEAR)
+        weight = cv2.warpPerspective(self._mask(h, w, opacity), matrix, size, flags=cv2.INTER_LINEAR)
+        roi = frame[y0:y1, x0:x1]
+        cv2.blendLinear(roi, warped, cv2.subtract(1.0, weight), weight, dst=roi)
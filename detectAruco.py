@@ -3,6 +3,10 @@ import numpy as np
 from cv2 import aruco
 from cvzone.HandTrackingModule import HandDetector
 import time
+from detection import DetectionExecutor
+from scaled_detection import ScaledHandDetector, ScaledMarkerDetector, open_native_capture
+from calc_engine import CalcError, evaluate, format_result
+from gestures import GestureEngine
 
 class ARCalculator:
     def __init__(self):
@@ -19,6 +23,9 @@ class ARCalculator:
             detectionCon=0.8,
             minTrackCon=0.5
         )
+        # Hands are inferred at 320x240 and markers at half the display size; both map back to 800x600
+        self.detector = DetectionExecutor(ScaledHandDetector(self.hand_detector, (320, 240)),
+                                          ScaledMarkerDetector(self.aruco_detector, 0.5))
         
         # UI configuration
         self.ui_scale_factor = 2.1
@@ -49,18 +56,16 @@ class ARCalculator:
         ]
         self.current_input = ""
         self.current_result = ""
-        self.last_button_press_time = 0
-        self.debounce_time = 0.3
         self.active_buttons = []
+        # Thumb/index pinch relative to the palm length, with hysteresis instead of a debounce
+        self.gestures = GestureEngine(pinch=(4, 8), pointer=8, press_ratio=0.25, release_ratio=0.35)
         
         # Initialize camera
         #ip_url = "http://192.168.169.127:8080/video"
         #self.cap = cv2.VideoCapture(ip_url)
-        self.cap = cv2.VideoCapture(0)
-
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+        # Ask for the display size so frames need no resize when the camera supports it
+        self.display_size = (800, 600)
+        self.cap, self.capture_size = open_native_capture(0, *self.display_size)
         
         # Create 800x600 window
         cv2.namedWindow("AR Calculator", cv2.WINDOW_NORMAL)
@@ -118,10 +123,7 @@ class ARCalculator:
         return coords
 
     def detect_button_press(self, fingertip_pos, button_coords):
-        current_time = time.time()
-        if current_time - self.last_button_press_time < self.debounce_time:
-            return None
-            
+        # Called once per pinch "press" event, so no debounce is needed
         pressed_button = None
         for button in button_coords:
             if button["x1"] <= fingertip_pos[0] <= button["x2"] and button["y1"] <= fingertip_pos[1] <= button["y2"]:
@@ -143,8 +145,6 @@ class ARCalculator:
                     self.current_input = self.current_input[:-1]
                 else:
                     self.current_input += button["label"]
-                
-                self.last_button_press_time = current_time
                 break
             else:
                 if not button.get("is_slider", False):
@@ -167,8 +167,8 @@ class ARCalculator:
             return
             
         try:
-            self.current_result = str(eval(self.current_input))
-        except:
+            self.current_result = format_result(evaluate(self.current_input))
+        except CalcError:
             self.current_result = "Error"
 
     def draw_ui(self, frame, button_coords):
@@ -251,16 +251,20 @@ class ARCalculator:
             ret, frame = self.cap.read()
             if not ret:
                 break
+            timestamp = time.time()
 
-            # Flip frame and resize to 800x600
-            frame = cv2.flip(frame, 1)
-            display_frame = cv2.resize(frame, (800, 600))
+            # Flip frame, and resize to 800x600 only if the camera has no such mode
+            display_frame = cv2.flip(frame, 1)
+            if display_frame.shape[1::-1] != self.display_size:
+                display_frame = cv2.resize(display_frame, self.display_size)
             
-            # Detect hands first
-            hands, _ = self.hand_detector.findHands(display_frame, flipType=False)
-            
-            # Detect markers on the display frame (800x600)
-            corners, ids, _ = self.aruco_detector.detectMarkers(display_frame)
+            # Detect hands and markers concurrently; results are in display (800x600) coordinates
+            hands, corners, ids = self.detector.detect(display_frame)
+
+            # One gesture update per frame, so a pinch presses once however many markers are seen
+            hand = hands[0] if hands and len(hands[0]["lmList"]) > 12 else None
+            events = self.gestures.update(hand, timestamp)
+            press = any(event.kind == "press" for event in events)
             
             if ids is not None:
                 for i, marker_id in enumerate(ids):
@@ -281,40 +285,34 @@ class ARCalculator:
                         self.draw_ui(display_frame, button_coords)
                         
                         # Process hand interaction
-                        if hands:
-                            hand = hands[0]
-                            lmList = hand["lmList"]
+                        if hand is not None:
+                            index_tip = self.gestures.pointer
+                            cv2.circle(display_frame, (int(index_tip[0]), int(index_tip[1])), 10, 
+                                      (0, 0, 255) if self.gestures.pressed else (0, 255, 0), -1)
                             
-                            if len(lmList) > 12:
-                                index_tip = lmList[8][0:2]
-                                thumb_tip = lmList[4][0:2]
-                                
-                                distance = np.linalg.norm(np.array(index_tip) - np.array(thumb_tip))
-                                cv2.circle(display_frame, (int(index_tip[0]), int(index_tip[1])), 10, 
-                                          (0, 255, 0) if distance > 30 else (0, 0, 255), -1)
-                                
-                                if self.is_sliding:
-                                    if distance < 30:
-                                        self.update_slider_position(index_tip[0])
-                                    else:
-                                        self.is_sliding = False
-                                        if self.ui_visibility > 0.7:
-                                            self.ui_visibility = 1.0
-                                        elif self.ui_visibility < 0.3:
-                                            self.ui_visibility = 0.0
+                            if self.is_sliding:
+                                if self.gestures.pressed:
+                                    self.update_slider_position(index_tip[0])
                                 else:
-                                    if distance < 30:
-                                        pressed_button = self.detect_button_press(index_tip, button_coords)
-                                        if pressed_button == "slider":
-                                            self.is_sliding = True
-                                            self.slider_grab_pos = index_tip[0]
-                                    else:
-                                        for button in button_coords:
-                                            if button.get("is_slider", False):
-                                                continue
-                                            if button["x1"] <= index_tip[0] <= button["x2"] and button["y1"] <= index_tip[1] <= button["y2"]:
-                                                button["state"] = "hover"
-                                                break
+                                    self.is_sliding = False
+                                    if self.ui_visibility > 0.7:
+                                        self.ui_visibility = 1.0
+                                    elif self.ui_visibility < 0.3:
+                                        self.ui_visibility = 0.0
+                            elif press:
+                                pressed_button = self.detect_button_press(index_tip, button_coords)
+                                if pressed_button is not None:
+                                    press = False  # this pinch is used up
+                                if pressed_button == "slider":
+                                    self.is_sliding = True
+                                    self.slider_grab_pos = index_tip[0]
+                            elif not self.gestures.pressed:
+                                for button in button_coords:
+                                    if button.get("is_slider", False):
+                                        continue
+                                    if button["x1"] <= index_tip[0] <= button["x2"] and button["y1"] <= index_tip[1] <= button["y2"]:
+                                        button["state"] = "hover"
+                                        break
 
             # Display FPS
             if self.frame_count % 10 == 0:
@@ -335,6 +333,7 @@ class ARCalculator:
             self.frame_count += 1
 
         self.cap.release()
+        self.detector.close()
         cv2.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+
+class DetectionExecutor:
+    """Runs hand and ArUco detection for one frame, concurrently by default.
+
+    Marker detection is submitted to a worker thread while the hand model runs
+    on the calling thread; both spend most of their time in native code that
+    releases the GIL, so a frame costs roughly max(hand, marker) instead of
+    their sum. parallel=False runs them back to back for A/B benchmarking.
+    """
+
+    def __init__(self, hand_detector, marker_detector, parallel=True):
+        self.hand_detector = hand_detector
+        self.marker_detector = marker_detector
+        self.parallel = parallel
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="markers") if parallel else None
+        self.timings = {"hands": 0.0, "markers": 0.0, "total": 0.0}
+
+    def _find_hands(self, frame, timestamp):
+        start = time.perf_counter()
+        # Only schedulers that extrapolate take a timestamp; plain detectors are called as before
+        kwargs = {} if timestamp is None else {"timestamp": timestamp}
+        hands, _ = self.hand_detector.findHands(frame, flipType=False, **kwargs)
+        self.timings["hands"] = time.perf_counter() - start
+        return hands
+
+    def _detect_markers(self, gray):
+        start = time.perf_counter()
+        corners, ids, _ = self.marker_detector.detectMarkers(gray)
+        self.timings["markers"] = time.perf_counter() - start
+        return corners, ids
+
+    def detect(self, frame, timestamp=None):
+        start = time.perf_counter()
+        # Markers get their own grayscale copy, so findHands may draw on frame meanwhile
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.pool is None:
+            hands = self._find_hands(frame, timestamp)
+            corners, ids = self._detect_markers(gray)
+        else:
+            markers = self.pool.submit(self._detect_markers, gray)
+            hands = self._find_hands(frame, timestamp)
+            corners, ids = markers.result()
+        self.timings["total"] = time.perf_counter() - start
+        return hands, corners, ids
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
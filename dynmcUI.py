@@ -1,58 +1,80 @@
 import cv2
-import mediapipe as mp
-import numpy as np
-import math
+import time
 
-# Initialize Mediapipe Hand tracking
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.7)
-mp_draw = mp.solutions.drawing_utils
+from calc_engine import CalcError, evaluate, format_result
+from gestures import GestureEngine
+from hand_utils import hand_array
+from hand_worker import HandInferenceWorker
+from palm_keypad import PalmKeypad
 
-# Open webcam
-cap = cv2.VideoCapture(0)
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+def main():
+    # Mediapipe hand tracking runs in a worker process; frames go over shared memory
+    hands = HandInferenceWorker(max_hands=2, detection_con=0.7, track_con=0.5)
 
-    # Flip the frame for a natural view
-    frame = cv2.flip(frame, 1)
-    h, w, c = frame.shape
+    # Open webcam
+    cap = cv2.VideoCapture(0)
 
-    # Convert to RGB
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    # Keypad drawn on the left palm, pressed by pinching with the other hand
+    keypad = PalmKeypad()
+    pointer = GestureEngine(pinch=(4, 8), pointer=8)
+    expression = ""
 
-    # Detect hands
-    result = hands.process(rgb_frame)
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
 
-    if result.multi_hand_landmarks:
-        for hand_landmarks, hand_info in zip(result.multi_hand_landmarks, result.multi_handedness):
-            label = hand_info.classification[0].label
+        # Flip the frame for a natural view
+        frame = cv2.flip(frame, 1)
 
-            if label == "Left":  # Check for left hand
-                # Get wrist (landmark[0]) and middle finger base (landmark[9]) positions
-                x0, y0 = int(hand_landmarks.landmark[0].x * w), int(hand_landmarks.landmark[0].y * h)
-                x9, y9 = int(hand_landmarks.landmark[9].x * w), int(hand_landmarks.landmark[9].y * h)
+        # Detect hands; flipType=False keeps Mediapipe's own handedness labels
+        timestamp = time.perf_counter()
+        palm_hand = other_hand = None
+        for hand in hands.findHands(frame, draw=False, flipType=False):
+            if hand["type"] == "Left":  # Check for left hand
+                palm_hand = hand_array(hand)
+            else:
+                other_hand = hand
 
-                # Calculate palm size based on Euclidean distance
-                palm_size = int(math.sqrt((x9 - x0) ** 2 + (y9 - y0) ** 2)) * 2
+        if palm_hand is not None:
+            # Keypad is centred on the palm, two palm lengths wide, and turns with the hand
+            keypad.place(palm_hand, timestamp)
+        else:
+            keypad.hide()
 
-                # Define calculator size based on palm size
-                calc_size = palm_size
+        for event in pointer.update(other_hand, timestamp):
+            if event.kind != "press":
+                continue
+            key = keypad.hit_test(event.position)
+            if key == "C":
+                expression = ""
+            elif key == "<":
+                expression = expression[:-1]
+            elif key == "=":
+                try:
+                    expression = format_result(evaluate(expression))
+                except CalcError:
+                    expression = "Error"
+            elif key is not None:
+                expression = ("" if expression == "Error" else expression) + key
 
-                # Calculate top-left corner for centered UI
-                calc_x, calc_y = x0 - calc_size // 2, y0 - calc_size // 2
+        hover = keypad.hit_test(pointer.pointer) if pointer.pointer is not None else None
+        keypad.draw(frame, expression, hover)
+        if pointer.pointer is not None:
+            cv2.circle(frame, tuple(int(v) for v in pointer.pointer), 6, (0, 255, 0), -1)
 
-                # Draw Calculator UI over palm (Dynamic size)
-                cv2.rectangle(frame, (calc_x, calc_y), (calc_x + calc_size, calc_y + calc_size), (0, 255, 0), 2)
-                cv2.putText(frame, "Calculator UI", (calc_x + 10, calc_y + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        # Display the frame
+        cv2.imshow("Virtual Calculator", frame)
 
-    # Display the frame
-    cv2.imshow("Virtual Calculator", frame)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
 
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+    cap.release()
+    hands.close()
+    cv2.destroyAllWindows()
 
-cap.release()
-cv2.destroyAllWindows()
+
+# Guarded, because the hand worker process imports this module
+if __name__ == "__main__":
+    main()
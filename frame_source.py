@@ -0,0 +1,408 @@
+import http.client
+import json
+import socket
+import struct
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from threading import Condition, Thread
+
+import cv2
+import numpy as np
+
+# Session file layout:
+#   MAGIC, uint32 header length, JSON header
+#   repeated records: RECORD header, encoded frame bytes, JSON detections
+MAGIC = b"ARSESS1\n"
+RECORD = struct.Struct("<IdII")  # seq, capture timestamp, frame bytes, detection bytes
+
+
+class CameraSource:
+    """Live frames from a device index, video file or URL via cv2.VideoCapture."""
+
+    def __init__(self, src=0, width=640, height=480, fps=30, timeout=5.0):
+        self.src = src
+        self.width, self.height, self.fps = width, height, fps
+        self.timeout = timeout
+        self.cap = None
+        self.reopen()
+
+    def reopen(self):
+        if self.cap is not None:
+            self.cap.release()
+        if isinstance(self.src, str) and "://" in self.src:
+            # Network streams fail a stalled open or read instead of blocking forever
+            timeout_ms = int(self.timeout * 1000)
+            self.cap = cv2.VideoCapture(self.src, cv2.CAP_ANY,
+                                        [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                                         cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
+        else:
+            self.cap = cv2.VideoCapture(self.src)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimal buffering
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        return self.cap.isOpened()
+
+    def read(self, image=None):
+        if image is None:
+            return self.cap.read()
+        return self.cap.read(image)
+
+    def release(self):
+        self.cap.release()
+
+
+class MJPEGSource:
+    """Frames from an MJPEG-over-HTTP stream, such as a phone IP camera app.
+
+    A receiver thread reads the multipart stream and keeps only the newest
+    complete JPEG; read() decodes that one, so when the reader falls behind
+    stale frames are dropped unread instead of piling up in socket buffers.
+    read() fails when the connection drops or no frame arrives for
+    `timeout` seconds; reopen() connects again.
+    """
+
+    SOI, EOI = b"\xff\xd8", b"\xff\xd9"
+
+    def __init__(self, url, timeout=5.0, chunk_size=65536):
+        self.url = url
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.cond = Condition()
+        self.sock = None
+        self.response = None
+        self.thread = None
+        self.latest = None  # newest undecoded JPEG
+        self.received = 0
+        self.dropped = 0
+        self.reopen()
+
+    def reopen(self):
+        self.release()
+        with self.cond:
+            self.latest = None
+            self.error = None
+            self.closed = False
+        parts = urlsplit(self.url)
+        connection_type = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        try:
+            connection = connection_type(parts.netloc, timeout=self.timeout)
+            connection.connect()
+            # Kept so release() can shut the socket down under a blocked read
+            self.sock = connection.sock
+            connection.request("GET", path)
+            response = connection.getresponse()
+            if response.status != 200:
+                raise OSError(f"HTTP {response.status} from {self.url}")
+        except (OSError, http.client.HTTPException) as e:
+            self.error = e
+            return False
+        self.response = response
+        self.thread = Thread(target=self._receive, args=(response,), name="mjpeg-receive", daemon=True)
+        self.thread.start()
+        return True
+
+    def _receive(self, response):
+        buffer = bytearray()
+        try:
+            while not self.closed:
+                chunk = response.read1(self.chunk_size)
+                if not chunk:
+                    raise EOFError("MJPEG stream ended")
+                buffer += chunk
+                # Frames are delimited by the JPEG start/end markers; part headers are skipped
+                while True:
+                    start = buffer.find(self.SOI)
+                    if start < 0:
+                        del buffer[:-1]
+                        break
+                    end = buffer.find(self.EOI, start + 2)
+                    if end < 0:
+                        del buffer[:start]
+                        break
+                    jpeg = bytes(buffer[start:end + 2])
+                    del buffer[:end + 2]
+                    with self.cond:
+                        if self.latest is not None:
+                            self.dropped += 1
+                        self.latest = jpeg
+                        self.received += 1
+                        self.cond.notify_all()
+        except (OSError, ValueError, EOFError, http.client.HTTPException) as e:
+            with self.cond:
+                self.error = e
+                self.cond.notify_all()
+
+    def read(self, image=None):
+        # image is ignored: a decoded JPEG is always a new array
+        while True:
+            with self.cond:
+                if not self.cond.wait_for(lambda: self.latest is not None or self.error or self.closed,
+                                          self.timeout):
+                    return False, None  # stalled: no frame within the timeout
+                if self.latest is None:
+                    return False, None
+                jpeg, self.latest = self.latest, None
+            frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            if frame is not None:
+                return True, frame
+            # Corrupt or truncated JPEG; wait for the next one
+
+    def interrupt(self):
+        # Wakes a blocked read() so the capture thread can exit
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def release(self):
+        self.interrupt()
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # already disconnected
+        if self.thread is not None:
+            self.thread.join(timeout=self.timeout)
+            self.thread = None
+        if self.response is not None:
+            self.response.close()
+            self.response = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class PrefetchingVideo:
+    """Loops a video file for use as an overlay, decoded ahead on a background thread.
+
+    Up to buffer_size frames are decoded ahead; the decoder waits while the
+    buffer is full, so nothing is decoded unless frames are being consumed.
+    The rewind at the end of the file also happens on the decoder thread,
+    hidden behind the buffered frames. read() returns the frame due at the
+    current playback time, so the video plays at its own frame rate however
+    fast the caller loops; gaps between calls longer than pause_after pause
+    playback instead of skipping ahead. Passing size to read() makes the
+    decoder resize frames to that size as it goes (INTER_AREA), so the
+    caller gets small frames ready to warp.
+    """
+
+    def __init__(self, path, buffer_size=8, loop=True, pause_after=0.5):
+        self.path = path
+        self.loop = loop
+        self.buffer_size = max(1, buffer_size)
+        self.pause_after = pause_after
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open video {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.buffer = deque()  # (frame index, frame), oldest first
+        self.cond = Condition()
+        self.size = None  # decode-time resize target
+        self.current = None
+        self.position = 0.0  # playback time in seconds
+        self.last_read = None
+        self.stopped = False
+        self.ended = False
+        self.decoded = 0
+        self.skipped = 0
+        self.rewinds = 0
+        self.thread = Thread(target=self._decode, name="overlay decode", daemon=True)
+        self.thread.start()
+
+    def _decode(self):
+        index = 0
+        frames_this_pass = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.stopped or len(self.buffer) < self.buffer_size)
+                if self.stopped:
+                    break
+                size = self.size
+            ret, frame = self.cap.read()
+            if not ret:
+                if not self.loop or frames_this_pass == 0:
+                    break
+                # Rewind while the reader still has buffered frames to show
+                if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+                    self.cap.release()
+                    self.cap = cv2.VideoCapture(self.path)
+                self.rewinds += 1
+                frames_this_pass = 0
+                continue
+            if size is not None and (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            with self.cond:
+                self.buffer.append((index, frame))
+                self.decoded += 1
+                self.cond.notify_all()
+            index += 1
+            frames_this_pass += 1
+        with self.cond:
+            self.ended = True
+            self.cond.notify_all()
+        self.cap.release()
+
+    def read(self, size=None):
+        """Return (True, frame) for the current playback time, or (False, None) if there is none."""
+        now = time.perf_counter()
+        if self.last_read is not None and now - self.last_read < self.pause_after:
+            self.position += now - self.last_read
+        self.last_read = now
+        due = int(self.position * self.fps)
+        with self.cond:
+            if size is not None:
+                self.size = (int(size[0]), int(size[1]))
+            if self.current is None:
+                # Only the very first frame is waited for
+                self.cond.wait_for(lambda: self.buffer or self.ended, 1.0)
+            taken = 0
+            while self.buffer and (self.current is None or self.buffer[0][0] <= due):
+                self.current = self.buffer.popleft()
+                taken += 1
+            # More than one frame due means the caller (or decoder) fell behind
+            self.skipped += max(0, taken - 1)
+            if taken:
+                self.cond.notify_all()
+        if self.current is None:
+            return False, None
+        return True, self.current[1]
+
+    def release(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        self.thread.join(timeout=1.0)
+
+
+def open_source(src, width=640, height=480, fps=30):
+    """A frame source for a device index, video file, or camera URL."""
+    if isinstance(src, str) and src.startswith(("http://", "https://")):
+        return MJPEGSource(src)
+    return CameraSource(src, width, height, fps)
+
+
+def encode_detections(hands=None, corners=None, ids=None):
+    data = {}
+    if hands is not None:
+        data["hands"] = [{
+            "lmList": [[int(v) for v in lm] for lm in hand["lmList"]],
+            "bbox": [int(v) for v in hand["bbox"]],
+            "center": [int(v) for v in hand["center"]],
+            "type": hand.get("type", ""),
+        } for hand in hands]
+    if corners is not None:
+        data["corners"] = [np.asarray(c, dtype=np.float32).reshape(4, 2).tolist() for c in corners]
+        data["ids"] = None if ids is None else np.asarray(ids).reshape(-1).tolist()
+    return json.dumps(data, separators=(",", ":")).encode("utf-8") if data else b""
+
+
+def decode_detections(raw):
+    """Return (hands, corners, ids) in the shapes findHands/detectMarkers produce."""
+    if not raw:
+        return None
+    data = json.loads(raw.decode("utf-8"))
+    hands = None
+    if "hands" in data:
+        hands = [{
+            "lmList": hand["lmList"],
+            "bbox": tuple(hand["bbox"]),
+            "center": tuple(hand["center"]),
+            "type": hand["type"],
+        } for hand in data["hands"]]
+    corners, ids = (), None
+    if "corners" in data:
+        corners = tuple(np.array(c, dtype=np.float32).reshape(1, 4, 2) for c in data["corners"])
+        if data["ids"] is not None:
+            ids = np.array(data["ids"], dtype=np.int32).reshape(-1, 1)
+    return hands, corners, ids
+
+
+class SessionRecorder:
+    """Appends raw frames and their detections to a session file."""
+
+    def __init__(self, path, codec=".png"):
+        # PNG keeps replays bit-exact; ".jpg" gives much smaller sessions
+        self.path = path
+        self.codec = codec
+        self.seq = 0
+        self.file = open(path, "wb")
+        header = json.dumps({"version": 1, "codec": codec}).encode("utf-8")
+        self.file.write(MAGIC)
+        self.file.write(struct.pack("<I", len(header)))
+        self.file.write(header)
+
+    def write(self, frame, hands=None, corners=None, ids=None, timestamp=None):
+        ok, encoded = cv2.imencode(self.codec, frame)
+        if not ok:
+            raise ValueError(f"Could not encode frame as {self.codec}")
+        detections = encode_detections(hands, corners, ids)
+        timestamp = time.time() if timestamp is None else timestamp
+        self.file.write(RECORD.pack(self.seq, timestamp, len(encoded), len(detections)))
+        self.file.write(encoded.tobytes())
+        self.file.write(detections)
+        self.seq += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class ReplaySource:
+    """Plays back a recorded session, by default as fast as the caller reads."""
+
+    def __init__(self, path, realtime=False, loop=False):
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.file = open(path, "rb")
+        if self.file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a recorded session")
+        (header_len,) = struct.unpack("<I", self.file.read(4))
+        self.header = json.loads(self.file.read(header_len).decode("utf-8"))
+        self.data_start = self.file.tell()
+        self.seq = -1
+        self.timestamp = None
+        self.detections = None
+        self._first_ts = None
+        self._play_start = None
+
+    def start(self):
+        return self
+
+    def read(self, image=None):
+        raw = self.file.read(RECORD.size)
+        if len(raw) < RECORD.size and self.loop:
+            self.file.seek(self.data_start)
+            self._first_ts = None
+            raw = self.file.read(RECORD.size)
+        if len(raw) < RECORD.size:
+            self.detections = None
+            return False, None
+
+        self.seq, self.timestamp, frame_len, det_len = RECORD.unpack(raw)
+        frame = cv2.imdecode(np.frombuffer(self.file.read(frame_len), np.uint8), cv2.IMREAD_COLOR)
+        self.detections = decode_detections(self.file.read(det_len))
+
+        if self.realtime:
+            # Sleep until the recorded offset of this frame has elapsed
+            now = time.perf_counter()
+            if self._first_ts is None:
+                self._first_ts, self._play_start = self.timestamp, now
+            delay = (self.timestamp - self._first_ts) - (now - self._play_start)
+            if delay > 0:
+                time.sleep(delay)
+
+        if image is not None and image.shape == frame.shape:
+            np.copyto(image, frame)
+            frame = image
+        return True, frame
+
+    def release(self):
+        self.file.close()
+
+    def stop(self):
+        self.release()
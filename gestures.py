@@ -0,0 +1,123 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from hand_utils import hand_array
+
+# kind is "press", "hold" or "release"; position is the filtered pointer (x, y)
+GestureEvent = namedtuple("GestureEvent", "kind position timestamp")
+
+
+class OneEuroFilter:
+    """One Euro low-pass filter over an array of values (Casiez et al., CHI 2012).
+
+    The cutoff frequency rises with the speed of the signal: slow movement is
+    smoothed heavily, which removes landmark jitter, while fast movement is
+    barely delayed. Timestamps are in seconds, so the result does not depend
+    on the frame rate.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=0.02, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.value = None
+        self.derivative = None
+        self.timestamp = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        self.value = None
+
+    def filter(self, value, timestamp):
+        value = np.asarray(value, dtype=np.float32)
+        if self.value is None or self.value.shape != value.shape or timestamp <= self.timestamp:
+            self.value = value.copy()
+            self.derivative = np.zeros_like(value)
+            self.timestamp = timestamp
+            return self.value
+        dt = timestamp - self.timestamp
+        self.timestamp = timestamp
+        derivative = (value - self.value) / dt
+        a = self._alpha(self.d_cutoff, dt)
+        self.derivative += a * (derivative - self.derivative)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.value += a * (value - self.value)
+        return self.value
+
+
+class GestureEngine:
+    """Turns a stream of hand landmarks into press/hold/release events.
+
+    Landmarks are One Euro filtered, and the pinch distance between the two
+    `pinch` landmarks is divided by the palm length (wrist to middle finger
+    knuckle), so the same thresholds work near and far from the camera. A
+    pinch starts below press_ratio and only ends above release_ratio; the
+    gap between the two replaces a time-based debounce, so a press is
+    reported on the first frame the fingers close. A "hold" event follows
+    once a pinch has lasted hold_time seconds.
+    """
+
+    def __init__(self, pinch=(4, 8), pointer=8, press_ratio=0.25, release_ratio=0.35,
+                 hold_time=0.5, max_gap=0.3, min_cutoff=1.5, beta=0.02):
+        self.pinch = pinch
+        self.pointer_index = pointer
+        self.press_ratio = press_ratio
+        self.release_ratio = release_ratio
+        self.hold_time = hold_time
+        self.max_gap = max_gap  # a hand missing for longer than this ends the gesture
+        self.filter = OneEuroFilter(min_cutoff, beta)
+        self.landmarks = None
+        self.pointer = None
+        self.ratio = None
+        self.pressed = False
+        self.press_time = None
+        self.held = False
+        self.last_seen = None
+
+    def _release(self, timestamp):
+        events = []
+        if self.pressed:
+            events.append(GestureEvent("release", self.pointer, timestamp))
+        self.pressed = False
+        self.held = False
+        return events
+
+    def update(self, hand, timestamp):
+        """Feed one frame's hand (or None) and its capture time; returns the events it caused."""
+        if hand is None:
+            events = []
+            if self.last_seen is None or timestamp - self.last_seen > self.max_gap:
+                events = self._release(timestamp)
+                self.filter.reset()
+                self.landmarks = self.pointer = self.ratio = None
+            return events
+
+        if self.last_seen is not None and timestamp - self.last_seen > self.max_gap:
+            self.filter.reset()
+        self.last_seen = timestamp
+        self.landmarks = self.filter.filter(hand_array(hand)[:, :2], timestamp)
+        self.pointer = tuple(float(v) for v in self.landmarks[self.pointer_index])
+        palm = float(np.linalg.norm(self.landmarks[9] - self.landmarks[0]))
+        distance = float(np.linalg.norm(self.landmarks[self.pinch[0]] - self.landmarks[self.pinch[1]]))
+        self.ratio = distance / max(palm, 1.0)
+
+        events = []
+        if not self.pressed:
+            if self.ratio < self.press_ratio:
+                self.pressed = True
+                self.press_time = timestamp
+                events.append(GestureEvent("press", self.pointer, timestamp))
+        elif self.ratio > self.release_ratio:
+            events = self._release(timestamp)
+        elif not self.held and timestamp - self.press_time >= self.hold_time:
+            self.held = True
+            events.append(GestureEvent("hold", self.pointer, timestamp))
+        return events
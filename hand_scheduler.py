@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+
+from hand_utils import draw_hand, hand_array, make_hand
+
+
+class HandScheduler:
+    """Drop-in for HandDetector.findHands that runs the model only every few frames.
+
+    Between inferences the 21 landmarks of each hand are extrapolated with a
+    constant-velocity model, so hover/pinch logic still gets a fingertip every
+    frame. Pass each frame's capture timestamp, so queueing delay and replay
+    speed do not skew the extrapolation. With adaptive=True the interval
+    shrinks when the index fingertip moves fast and grows back to
+    max_interval when the hand is still.
+    """
+
+    def __init__(self, hand_detector, interval=2, adaptive=False, max_interval=4,
+                 slow_speed=150.0, fast_speed=900.0, max_prediction=0.25, smoothing=0.6):
+        self.hand_detector = hand_detector
+        self.interval = max(1, interval)
+        self.adaptive = adaptive
+        self.max_interval = max(self.interval, max_interval)
+        self.slow_speed = slow_speed  # px/s below which the longest interval is used
+        self.fast_speed = fast_speed  # px/s above which inference runs every frame
+        self.max_prediction = max_prediction  # never extrapolate further than this (s)
+        self.smoothing = smoothing  # weight of the newest velocity estimate
+        self.tracks = []  # [landmarks, velocity, timestamp, type] per hand
+        self.frames_since_inference = None
+        self.inferences = 0
+        self.predictions = 0
+
+    def current_interval(self):
+        if not self.adaptive:
+            return self.interval
+        if not self.tracks:
+            return 1
+        speed = max(np.linalg.norm(velocity[8, :2]) for _, velocity, _, _ in self.tracks)
+        if speed <= self.slow_speed:
+            return self.max_interval
+        if speed >= self.fast_speed:
+            return 1
+        span = (speed - self.slow_speed) / (self.fast_speed - self.slow_speed)
+        return max(1, int(round(self.max_interval - span * (self.max_interval - 1))))
+
+    def _infer(self, img, draw, flipType, now):
+        result = self.hand_detector.findHands(img, draw=draw, flipType=flipType)
+        # cvzone returns (hands, img) or just hands depending on draw and version
+        hands = result[0] if isinstance(result, tuple) else result
+        tracks = []
+        for hand in hands:
+            landmarks = hand_array(hand)
+            velocity = np.zeros_like(landmarks)
+            previous = self._match(hand)
+            if previous is not None:
+                dt = now - previous[2]
+                if 0 < dt <= self.max_prediction * 2:
+                    measured = (landmarks - previous[0]) / dt
+                    velocity = self.smoothing * measured + (1 - self.smoothing) * previous[1]
+            tracks.append([landmarks, velocity, now, hand.get("type", "Unknown")])
+        self.tracks = tracks
+        self.frames_since_inference = 0
+        self.inferences += 1
+        return hands
+
+    def _match(self, hand):
+        # Pair a new detection with the previous hand whose center is closest
+        if not self.tracks:
+            return None
+        center = np.asarray(hand["center"], dtype=np.float32)
+        return min(self.tracks, key=lambda t: np.linalg.norm(t[0][:, :2].mean(axis=0) - center))
+
+    def _predict(self, img, draw, now):
+        hands = []
+        for landmarks, velocity, timestamp, hand_type in self.tracks:
+            dt = min(now - timestamp, self.max_prediction)
+            hand = make_hand(landmarks + velocity * dt, hand_type)
+            hands.append(hand)
+            if draw:
+                draw_hand(img, hand)
+        self.frames_since_inference += 1
+        self.predictions += 1
+        return hands
+
+    def findHands(self, img, draw=True, flipType=True, timestamp=None):
+        # Predictions follow the frame's capture time, not when it reached this stage
+        now = time.perf_counter() if timestamp is None else timestamp
+        due = (self.frames_since_inference is None
+               or self.frames_since_inference + 1 >= self.current_interval())
+        if due:
+            hands = self._infer(img, draw, flipType, now)
+        else:
+            hands = self._predict(img, draw, now)
+        return (hands, img) if draw else hands
@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+
+# MediaPipe hand skeleton, as (landmark, landmark) pairs
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def make_hand(landmarks, hand_type="Unknown"):
+    """Build a cvzone-style hand dict from a (21, 2 or 3) array of pixel landmarks."""
+    landmarks = np.asarray(landmarks)
+    lmList = np.rint(landmarks).astype(int).tolist()
+    if landmarks.shape[1] == 2:
+        lmList = [lm + [0] for lm in lmList]
+    xs = [lm[0] for lm in lmList]
+    ys = [lm[1] for lm in lmList]
+    xmin, xmax, ymin, ymax = min(xs), max(xs), min(ys), max(ys)
+    bbox = (xmin, ymin, xmax - xmin, ymax - ymin)
+    center = (xmin + bbox[2] // 2, ymin + bbox[3] // 2)
+    return {"lmList": lmList, "bbox": bbox, "center": center, "type": hand_type}
+
+
+def hand_array(hand):
+    """Landmarks of a cvzone hand dict as a (21, 3) float32 array."""
+    return np.asarray(hand["lmList"], dtype=np.float32)
+
+
+def draw_hand(img, hand):
+    """Draw a hand the way cvzone's findHands(draw=True) does."""
+    lmList = hand["lmList"]
+    for a, b in HAND_CONNECTIONS:
+        cv2.line(img, tuple(lmList[a][:2]), tuple(lmList[b][:2]), (255, 255, 255), 2)
+    for lm in lmList:
+        cv2.circle(img, tuple(lm[:2]), 4, (0, 0, 255), cv2.FILLED)
+    x, y, w, h = hand["bbox"]
+    cv2.rectangle(img, (x - 20, y - 20), (x + w + 20, y + h + 20), (255, 0, 255), 2)
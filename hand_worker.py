@@ -0,0 +1,147 @@
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from hand_utils import draw_hand, make_hand
+from worker_utils import ignore_interrupts, worker_context
+
+
+def _serve(conn, max_hands, model_complexity, detection_con, track_con):
+    ignore_interrupts()
+    # Imported here so only the worker process loads the model
+    import cv2
+    import mediapipe as mp
+
+    hands_model = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=max_hands,
+                                           model_complexity=model_complexity,
+                                           min_detection_confidence=detection_con,
+                                           min_tracking_confidence=track_con)
+    attached = {}
+    conn.send("ready")
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        job_id, name, shape = job
+        block = attached.get(name)
+        if block is None:
+            block = attached[name] = shared_memory.SharedMemory(name=name)
+        frame = np.ndarray(shape, np.uint8, buffer=block.buf)
+        result = hands_model.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+        # (hands, 21, 3) landmarks in pixels, z scaled like x (cvzone convention)
+        h, w = shape[:2]
+        landmarks = np.zeros((0, 21, 3), np.float32)
+        labels = []
+        if result.multi_hand_landmarks:
+            landmarks = np.array([[(lm.x * w, lm.y * h, lm.z * w) for lm in hand.landmark]
+                                  for hand in result.multi_hand_landmarks], np.float32)
+            labels = [handedness.classification[0].label for handedness in result.multi_handedness]
+        del frame
+        conn.send((job_id, landmarks, labels))
+
+    hands_model.close()
+    for block in attached.values():
+        block.close()
+
+
+class HandInferenceWorker:
+    """MediaPipe hand tracking in a separate process, as a drop-in for HandDetector.
+
+    Frames are copied into shared memory blocks and only the block name goes
+    over the pipe; the worker sends back a compact (hands, 21, 3) landmark
+    array, so pixel data is never pickled and the model's Python-side work
+    does not compete with capture and drawing for the GIL.
+
+    findHands() waits for its own frame. submit()/collect() can keep up to
+    `depth` frames in flight; there is one process, because the model tracks
+    hands from frame to frame and has to see every frame in order.
+    """
+
+    worker = staticmethod(_serve)
+
+    def __init__(self, max_hands=1, model_complexity=1, detection_con=0.8, track_con=0.5, depth=2):
+        self.ctx = worker_context()
+        self.depth = max(1, depth)
+        self.conn, child = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=self.worker, name="hands", daemon=True,
+                                        args=(child, max_hands, model_complexity, detection_con, track_con))
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.blocks = []  # every shared memory block this worker created
+        self.free_blocks = []
+        self.in_flight = deque()  # job ids, oldest first
+        self.jobs = {}  # job id -> (block, flipType)
+        self.results = {}
+        self.next_id = 0
+
+    def submit(self, img, flipType=True):
+        """Send a BGR frame to the worker; returns a job id for collect()."""
+        if len(self.in_flight) >= self.depth:
+            # Wait for the oldest frame to free a block
+            self._receive()
+        block = self._block(img.nbytes)
+        np.copyto(np.ndarray(img.shape, np.uint8, buffer=block.buf), img)
+        self.next_id += 1
+        self.jobs[self.next_id] = (block, flipType)
+        self.in_flight.append(self.next_id)
+        self.conn.send((self.next_id, block.name, img.shape))
+        return self.next_id
+
+    def collect(self, job_id, img=None, draw=False):
+        """Hands for a submitted frame as cvzone-style dicts, blocking until they arrive."""
+        flipType = self.jobs[job_id][1]
+        while job_id not in self.results:
+            self._receive()
+        landmarks, labels = self.results.pop(job_id)
+        del self.jobs[job_id]
+        hands = []
+        for points, label in zip(landmarks, labels):
+            if flipType:
+                # cvzone reports handedness as seen by the user in a mirrored image
+                label = "Left" if label == "Right" else "Right"
+            hand = make_hand(points, label)
+            hands.append(hand)
+            if draw and img is not None:
+                draw_hand(img, hand)
+        return hands
+
+    def findHands(self, img, draw=True, flipType=True):
+        hands = self.collect(self.submit(img, flipType), img, draw)
+        return (hands, img) if draw else hands
+
+    def _block(self, size):
+        for i, block in enumerate(self.free_blocks):
+            if block.size >= size:
+                return self.free_blocks.pop(i)
+        block = shared_memory.SharedMemory(create=True, size=size)
+        self.blocks.append(block)
+        return block
+
+    def _receive(self):
+        message = self.conn.recv()
+        if message == "ready":
+            self.ready = True
+            return
+        job_id, landmarks, labels = message
+        self.in_flight.remove(job_id)
+        self.free_blocks.append(self.jobs[job_id][0])
+        self.results[job_id] = (landmarks, labels)
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
@@ -1,50 +1,170 @@
+import os
 import cv2
 import numpy as np
 from cv2 import aruco
 from cvzone.HandTrackingModule import HandDetector
 import time
-from threading import Thread
+import argparse
+from threading import Condition, Thread, current_thread
+from frame_source import ReplaySource, SessionRecorder, open_source
+from pipeline import NO_FRAME, Pipeline
+from detection import DetectionExecutor
+from marker_tracker import MarkerTracker
+from hand_scheduler import HandScheduler
+from hand_worker import HandInferenceWorker
+from panel_renderer import CalculatorPanelRenderer
+from async_eval import AsyncEvaluator
+from profiler import StageProfiler
+from tracing import FrameTracer
+from sessions import CalculatorSession, EvaluationQueue, assign_hands
+from streams import StreamScheduler, StreamView
+from mjpeg_server import MJPEGServer
 
 class WebcamStream:
-    def __init__(self, src=0):
-        self.cap = cv2.VideoCapture(src)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Minimal buffering
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Lower resolution
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
-        self.ret, self.frame = self.cap.read()
-        self.stopped = False
+    """Captures on a background thread into a ring of preallocated frame buffers.
+
+    read() blocks until a frame newer than the last one returned exists and
+    hands back the ring buffer itself, so nothing is allocated or copied per
+    frame. Only the slot read() returned last is protected from the capture
+    thread, so a frame stays valid until the next read(); callers that keep
+    it longer must copy it. seq and timestamp describe that frame.
+    Frames the reader was too slow for are overwritten, never queued.
+
+    Devices and camera URLs are reopened with exponential backoff when a
+    read fails (unplugged, network drop, stalled stream); a video file, or a
+    source object without reopen(), ends the stream instead. The capture
+    thread owns the source and releases it on exit, so stop() never closes
+    it under a read in progress.
+    """
+
+    live = True  # timestamps are capture times on this machine's clock
+
+    def __init__(self, src=0, buffers=4, reconnect=None, max_backoff=8.0):
+        # Accept any frame source object, or a device index, video file or camera URL
+        self.source = src if hasattr(src, "read") else open_source(src, 640, 480, 30)  # Lower resolution
+        self.name = src if isinstance(src, (int, str)) else type(src).__name__
+        if reconnect is None:
+            # Devices and network cameras come back; a video file that ends is finished
+            reconnect = isinstance(src, int) or (isinstance(src, str) and "://" in src)
+        self.reconnect = reconnect and hasattr(self.source, "reopen")
+        self.max_backoff = max_backoff
+        self.reconnects = 0
+        self.ret, frame = self.source.read()
+        # Empty slots are filled with whatever array the source returns. Three at
+        # least: one held by the reader, one published, one being written
+        self.ring = [frame] + [None if frame is None else np.empty_like(frame)
+                               for _ in range(max(3, buffers) - 1)]
+        self.write_index = 0
+        self.held_index = None  # slot handed to the reader; never written into
+        self.latest_seq = 0 if self.ret else -1
+        self.latest_timestamp = time.time()
+        self.seq = -1
+        self.timestamp = None
+        self.condition = Condition()
+        self.stopped = not self.ret and not self.reconnect
+        self.thread = None
+        self.on_frame = None  # called from the capture thread after each new frame
 
     def start(self):
-        Thread(target=self.update, args=()).start()  # Start thread
+        # Daemon, so a read stuck in the driver cannot keep the process alive
+        self.thread = Thread(target=self.update, args=(), name=f"capture {self.name}", daemon=True)
+        self.thread.start()
         return self
 
     def update(self):
+        backoff = 0.5
         while not self.stopped:
-            self.ret, self.frame = self.cap.read()
+            with self.condition:
+                # Never the reader's slot, nor the published one read() may hand out next
+                index = (self.write_index + 1) % len(self.ring)
+                while index in (self.held_index, self.write_index):
+                    index = (index + 1) % len(self.ring)
+            buffer = self.ring[index]
+            ret, frame = self.source.read(image=buffer)
+            timestamp = time.time()
+            if self.stopped:
+                break
+            if not ret and self.reconnect:
+                # Keep the last frame on hand and try again, waiting longer each time
+                self.ret = False
+                print(f"Capture from {self.name} failed; reconnecting in {backoff:.1f}s")
+                with self.condition:
+                    if self.condition.wait_for(lambda: self.stopped, backoff):
+                        break
+                backoff = min(backoff * 2, self.max_backoff)
+                if self.source.reopen():
+                    self.reconnects += 1
+                    print(f"Reconnected to {self.name}")
+                continue
+            with self.condition:
+                if not ret:
+                    # End of stream; wake the reader so it can exit
+                    self.ret = False
+                    self.stopped = True
+                elif frame is not None:
+                    if frame is not buffer:
+                        # The source could not decode in place (size changed); adopt its array
+                        self.ring[index] = frame
+                    self.ret = True
+                    self.write_index = index
+                    self.latest_seq += 1
+                    self.latest_timestamp = timestamp
+                    backoff = 0.5
+                self.condition.notify_all()
+            if self.on_frame is not None:
+                self.on_frame()
+        self.source.release()
+
+    def ready(self):
+        """True when read() would return at once: a newer frame exists or the stream has ended."""
+        return self.latest_seq > self.seq or self.stopped
 
-    def read(self):
-        return self.ret, self.frame
+    def read(self, timeout=None):
+        """Block until a frame newer than the previous read() exists; (False, None) once stopped."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.latest_seq > self.seq or self.stopped, timeout):
+                return False, None
+            if self.latest_seq <= self.seq:
+                return False, None
+            self.held_index = self.write_index
+            self.seq = self.latest_seq
+            self.timestamp = self.latest_timestamp
+            return True, self.ring[self.write_index]
 
     def stop(self):
-        self.stopped = True
-        self.cap.release()
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if hasattr(self.source, "interrupt"):
+            # Unblocks a network read now rather than after its timeout
+            self.source.interrupt()
+        if self.thread is None:
+            self.source.release()
+        elif self.thread is not current_thread():
+            self.thread.join(timeout=2.0)
 
 class ARCalculator:
-    def __init__(self):
+    def __init__(self, source=None, recorder=None, use_recorded_detections=False, headless=False,
+                 pipelined=False, queue_depth=1, drop_frames=True, parallel_detection=True,
+                 full_scan_interval=30, hand_interval=1, adaptive_hands=False, inference_worker=False,
+                 profile_export=None, profile_interval=10.0, hud=False, trace_path=None,
+                 hand_detector=None, marker_ids=(0, 8), max_hands=1, workers=None, output=None,
+                 capture_timeout=0.1):
         # Aruco setup
         self.aruco_dict = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
         self.aruco_params = aruco.DetectorParameters()
         self.aruco_detector = aruco.ArucoDetector(self.aruco_dict, self.aruco_params)
         
-        # Hand detector setup
-        self.hand_detector = HandDetector(
-            staticMode=False,
-            maxHands=1,
-            modelComplexity=1,
-            detectionCon=0.8,
-            minTrackCon=0.5
-        )
+        # Hand detector setup; any object with findHands() can be passed in (e.g. by benchmarks)
+        self.hand_detector_override = hand_detector
+        self.inference_worker = inference_worker
+        self.max_hands = max_hands
+        # Each of these markers anchors its own calculator; track them instead of rescanning every frame
+        self.marker_ids = tuple(marker_ids)
+        self.full_scan_interval = full_scan_interval
+        self.hand_interval = hand_interval
+        self.adaptive_hands = adaptive_hands
+        self.parallel_detection = parallel_detection
         
         # UI configuration
         self.ui_scale_factor = 2.1
@@ -52,9 +172,6 @@ class ARCalculator:
         self.button_spacing = 5
         self.display_height = 80
         self.slider_width = 30
-        self.ui_visibility = 0.0
-        self.is_sliding = False
-        self.slider_grab_pos = 0
         
         # Colors with hover effect
         self.button_colors = {
@@ -65,6 +182,8 @@ class ARCalculator:
             'slider': (200, 200, 200, 200)
         }
         
+        self.panel_renderer = CalculatorPanelRenderer(self)
+        
         # Calculator state
         self.button_labels = [
             ["7", "8", "9", "/"],
@@ -73,294 +192,432 @@ class ARCalculator:
             ["C", "0", ".", "+"],
             ["(", ")", "<", "="]
         ]
-        self.current_input = ""
-        self.current_result = ""
-        self.last_button_press_time = 0
-        self.debounce_time = 0.3
-        self.active_buttons = []
+        # All sessions share one evaluation worker, one "=" at a time
+        self.evaluator = AsyncEvaluator(timeout=1.0)
+        self.evaluations = EvaluationQueue(self.evaluator)
         
-        # Initialize camera (with multithreading)
+        # Session recording / replay
+        self.recorder = recorder
+        self.use_recorded_detections = use_recorded_detections
+        self.headless = headless
+        # Optional MJPEG server that publishes the composited frames (one channel per stream)
+        self.output = output
+
+        # Threaded capture is waited on this long at a time, so a camera that is down (and
+        # reconnecting) never stops the loop from pumping the window or seeing a quit
+        self.capture_timeout = capture_timeout
+
+        # Staged pipeline: a deeper, non-dropping queue trades latency for throughput
+        self.pipelined = pipelined
+        self.queue_depth = queue_depth
+        self.drop_frames = drop_frames
+        self.dropped_frames = {}
+
+        # Performance tracking: rolling per-stage percentiles, 'p' toggles the HUD
+        self.profile_export = profile_export
+        self.profile_interval = profile_interval
+        self.hud = hud
+        # Motion-to-photon tracing of every frame from capture to imshow
+        self.tracer = FrameTracer(trace_path) if trace_path else None
+
+        # Initialize cameras (with multithreading); a list of sources runs one kiosk per source
         ip_url = "http://192.168.0.104:8080/video"
-        #self.stream = WebcamStream(ip_url).start()
-        self.stream = WebcamStream(0).start()
-        time.sleep(1.0)  # Allow camera to warm up
-        
-        # Create window
-        cv2.namedWindow("AR Calculator", cv2.WINDOW_NORMAL)
-        cv2.resizeWindow("AR Calculator", 800, 600)
-        
-        # Performance tracking
-        self.frame_count = 0
+        # e.g. ARCalculator([0, ip_url]) runs the webcam and a phone camera side by side
+        sources = list(source) if isinstance(source, (list, tuple)) else [source]
+        if len(sources) > 1 and (recorder is not None or use_recorded_detections):
+            raise ValueError("Recording and replay work with a single source")
+        self.workers = workers
+        self.views = [self._make_view(index, src, len(sources)) for index, src in enumerate(sources)]
+        if any(not callable(getattr(src, "start", None)) for src in sources):
+            time.sleep(1.0)  # Allow cameras to warm up
         self.start_time = time.time()
 
-    def get_button_coords(self, ui_top_left):
-        coords = []
-        total_width = 4 * self.button_width + 3 * self.button_spacing
-        
-        # Slider button
-        slider_x = int(ui_top_left[0] + total_width * self.ui_visibility)
-        coords.append({
-            "label": "slider",
-            "x1": slider_x,
-            "y1": int(ui_top_left[1]),
-            "x2": slider_x + self.slider_width,
-            "y2": int(ui_top_left[1] + self.display_height + 5 * (self.button_height + self.button_spacing)),
-            "state": "normal",
-            "is_slider": True
-        })
-        
-        if self.ui_visibility > 0:
-            # Display box
-            display_x = int(ui_top_left[0] - total_width * (1 - self.ui_visibility))
-            coords.append({
-                "label": "display",
-                "x1": display_x,
-                "y1": int(ui_top_left[1]),
-                "x2": display_x + total_width,
-                "y2": int(ui_top_left[1] + self.display_height),
-                "state": "display",
-                "is_slider": False
-            })
-            
-            # Calculator buttons
-            for row_idx, row in enumerate(self.button_labels):
-                for col_idx, label in enumerate(row):
-                    x1 = int(display_x + col_idx * (self.button_width + self.button_spacing))
-                    y1 = int(ui_top_left[1] + self.display_height + self.button_spacing + 
-                             row_idx * (self.button_height + self.button_spacing))
-                    x2 = x1 + self.button_width
-                    y2 = y1 + self.button_height
-                    coords.append({
-                        "label": label,
-                        "x1": x1, "y1": y1,
-                        "x2": x2, "y2": y2,
-                        "state": "normal",
-                        "is_slider": False
-                    })
-        
-        return coords
+    def _make_view(self, index, source, count):
+        if source is None:
+            stream = WebcamStream(0).start()
+        elif callable(getattr(source, "start", None)):
+            # Replayed sessions are read synchronously so no frame is skipped
+            stream = source.start()
+        else:
+            # Device index, video file or URL, captured on its own thread
+            stream = WebcamStream(source).start()
 
-    def detect_button_press(self, fingertip_pos, button_coords):
-        current_time = time.time()
-        if current_time - self.last_button_press_time < self.debounce_time:
-            return None
-            
-        pressed_button = None
-        for button in button_coords:
-            if button["x1"] <= fingertip_pos[0] <= button["x2"] and button["y1"] <= fingertip_pos[1] <= button["y2"]:
-                if button.get("is_slider", False):
-                    self.is_sliding = True
-                    self.slider_grab_pos = fingertip_pos[0]
-                    return "slider"
-                
-                button["state"] = "pressed"
-                pressed_button = button["label"]
-                
-                # Handle special buttons
-                if button["label"] == "=":
-                    self.calculate_result()
-                elif button["label"] == "C":
-                    self.current_input = ""
-                    self.current_result = ""
-                elif button["label"] == "<":
-                    self.current_input = self.current_input[:-1]
-                else:
-                    self.current_input += button["label"]
-                
-                self.last_button_press_time = current_time
-                break
-            else:
-                if not button.get("is_slider", False):
-                    button["state"] = "normal"
-        
-        return pressed_button
-
-    def update_slider_position(self, current_pos):
-        if not self.is_sliding:
-            return
-            
-        delta = current_pos - self.slider_grab_pos
-        self.slider_grab_pos = current_pos
-        
-        self.ui_visibility += delta / (4 * self.button_width + 3 * self.button_spacing)
-        self.ui_visibility = max(0.0, min(1.0, self.ui_visibility))
+        # Trackers keep per-stream state, so every stream gets its own detectors
+        if self.hand_detector_override is not None:
+            hand_detector = self.hand_detector_override
+        elif self.inference_worker:
+            # MediaPipe runs in a worker process; frames travel through shared memory
+            hand_detector = HandInferenceWorker(
+                max_hands=self.max_hands,
+                model_complexity=1,
+                detection_con=0.8,
+                track_con=0.5
+            )
+        else:
+            hand_detector = HandDetector(
+                staticMode=False,
+                maxHands=self.max_hands,
+                modelComplexity=1,
+                detectionCon=0.8,
+                minTrackCon=0.5
+            )
+        aruco_detector = self.aruco_detector if index == 0 else aruco.ArucoDetector(self.aruco_dict,
+                                                                                    self.aruco_params)
+        marker_tracker = MarkerTracker(aruco_detector, self.marker_ids, self.full_scan_interval)
+        # Run the hand model every few frames and predict landmarks in between
+        hand_scheduler = HandScheduler(hand_detector, self.hand_interval, adaptive=self.adaptive_hands)
+        # With several streams the shared worker pool provides the parallelism
+        detector = DetectionExecutor(hand_scheduler, marker_tracker, self.parallel_detection and count == 1)
 
-    def calculate_result(self):
-        if not self.current_input:
-            return
-            
-        try:
-            self.current_result = str(eval(self.current_input))
-        except:
-            self.current_result = "Error"
+        export_path = self.profile_export
+        if export_path and index > 0:
+            root, ext = os.path.splitext(export_path)
+            export_path = f"{root}.{index}{ext}"
+        profiler = StageProfiler(export_path=export_path, export_interval=self.profile_interval, hud=self.hud)
+        window = "AR Calculator" if count == 1 else f"AR Calculator {index + 1}"
+        return StreamView(index, stream, hand_detector, hand_scheduler, marker_tracker, detector,
+                          profiler, window)
 
-    def draw_ui(self, frame, button_coords):
-        overlay = frame.copy()
-        
-        for button in button_coords:
-            if button["label"] == "slider":
-                # Draw slider button
-                color = self.button_colors["slider"]
-                cv2.rectangle(overlay, (button["x1"], button["y1"]), 
-                            (button["x2"], button["y2"]), color[:3], -1)
-                cv2.rectangle(overlay, (button["x1"], button["y1"]), 
-                            (button["x2"], button["y2"]), (0, 0, 0), 2)
-                
-                # Draw slider arrow
-                arrow_size = 15
-                center_x = button["x1"] + self.slider_width // 2
-                center_y = button["y1"] + (button["y2"] - button["y1"]) // 2
-                if self.ui_visibility < 0.5:
-                    pts = np.array([[center_x, center_y], 
-                                 [center_x + arrow_size, center_y - arrow_size],
-                                 [center_x + arrow_size, center_y + arrow_size]])
-                else:
-                    pts = np.array([[center_x, center_y],
-                                 [center_x - arrow_size, center_y - arrow_size],
-                                 [center_x - arrow_size, center_y + arrow_size]])
-                cv2.fillPoly(overlay, [pts], (0, 0, 0))
-                
-            elif button["label"] == "display":
-                # Draw display box
-                color = self.button_colors["display"]
-                cv2.rectangle(overlay, (button["x1"], button["y1"]), 
-                            (button["x2"], button["y2"]), color[:3], -1)
-                cv2.rectangle(overlay, (button["x1"], button["y1"]), 
-                            (button["x2"], button["y2"]), (0, 0, 0), 2)
-                
-                # Display input and result
-                input_text = self.current_input if len(self.current_input) < 20 else "..." + self.current_input[-17:]
-                cv2.putText(overlay, input_text, 
-                            (button["x1"] + 10, button["y1"] + 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, 
-                            (255, 255, 255), 2)
-                
-                if self.current_result:
-                    cv2.putText(overlay, f"= {self.current_result}", 
-                                (button["x1"] + 10, button["y1"] + 60), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, 
-                                (200, 200, 0), 2)
+    def session(self, marker_id=0, view=None):
+        # One session (input, slider, layout, gestures) per marker, created when it is first seen
+        view = self.views[0] if view is None else view
+        session = view.sessions.get(marker_id)
+        if session is None:
+            session = view.sessions[marker_id] = CalculatorSession(self, marker_id)
+        return session
+
+    def get_button_coords(self, ui_top_left, marker_id=0, view=None):
+        # One cached layout per marker; only recomputed when the anchor or visibility moves
+        return self.session(marker_id, view).place(ui_top_left)
+
+    def poll_result(self):
+        self.evaluations.poll()
+
+    def draw_ui(self, frame, session):
+        # Keypad sprites are cached (and shared by all sessions) and blended only over the panel
+        preview = session.live_evaluator.preview(session.current_input)
+        result = "evaluating..." if session.evaluating else session.current_result
+        self.panel_renderer.draw(frame, session.layout, session.current_input,
+                                 result, session.ui_visibility, preview)
+
+    def capture(self, view=None):
+        # Waits for a frame newer than the last one, so none is processed twice; returns
+        # NO_FRAME if a threaded stream has none within capture_timeout, None once it has ended
+        view = self.views[0] if view is None else view
+        stream = view.stream
+        with view.profiler.stage("capture"):
+            if hasattr(stream, "ready"):
+                ret, frame = stream.read(timeout=self.capture_timeout)
+                if not ret and not stream.stopped:
+                    return NO_FRAME
             else:
-                # Enhanced button drawing with hover effects
-                color = self.button_colors[button["state"]]
-                
-                # Add glow effect for hover state
-                if button["state"] == "hover":
-                    glow = overlay.copy()
-                    cv2.rectangle(glow, 
-                                (button["x1"]-3, button["y1"]-3), 
-                                (button["x2"]+3, button["y2"]+3), 
-                                (173, 216, 230), -1)
-                    overlay = cv2.addWeighted(overlay, 0.7, glow, 0.3, 0)
-                
-                # Draw button
-                cv2.rectangle(overlay, (button["x1"], button["y1"]), 
-                            (button["x2"], button["y2"]), color[:3], -1)
-                cv2.rectangle(overlay, (button["x1"], button["y1"]), 
-                            (button["x2"], button["y2"]), (0, 0, 0), 2)
-                
-                # Draw label
-                text_size = cv2.getTextSize(button["label"], cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
-                text_x = button["x1"] + (self.button_width - text_size[0]) // 2
-                text_y = button["y1"] + (self.button_height + text_size[1]) // 2
-                cv2.putText(overlay, button["label"], (text_x, text_y), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        
-        # Blend the overlay
-        cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
+                ret, frame = stream.read()
+        if not ret:
+            return None
+        if self.recorder is not None or self.pipelined or len(self.views) > 1:
+            # The ring slot is reused after the next read(); a packet that is recorded, queued
+            # between pipeline stages or processed on a worker must own its pixels
+            frame = frame.copy()
+        # timestamp is the capture time (from the recording when replaying) and drives gestures;
+        # captured only measures frame age, which for a replay starts at the read here
+        captured = stream.timestamp if getattr(stream, "live", False) else time.time()
+        # Snapshot replayed detections now; the stream moves on to later frames
+        return {"view": view, "stream": view.index, "raw": frame, "seq": stream.seq,
+                "timestamp": stream.timestamp, "captured": captured,
+                "recorded": getattr(stream, "detections", None)}
 
-    def run(self):
-        while True:
-            ret, frame = self.stream.read()
-            if not ret:
-                break
+    def preprocess(self, packet):
+        # Flip frame and resize to 800x600
+        with packet["view"].profiler.stage("flip/resize"):
+            frame = cv2.flip(packet["raw"], 1)
+            packet["frame"] = cv2.resize(frame, (800, 600))
+        return packet
+
+    def detect(self, packet):
+        view = packet["view"]
+        display_frame = packet["frame"]
+        recorded = packet["recorded"]
+        if self.use_recorded_detections and recorded is not None:
+            # Skip inference and feed back what was detected when recording
+            hands, corners, ids = recorded
+        else:
+            # Detect hands and markers on the display frame (800x600) concurrently
+            hands, corners, ids = view.detector.detect(display_frame, packet["timestamp"])
+            timings = view.detector.timings
+            view.profiler.record("findHands", timings["hands"])
+            view.profiler.record("detectMarkers", timings["markers"])
+
+        if self.recorder is not None:
+            self.recorder.write(packet["raw"], hands, corners, ids, packet["timestamp"])
+
+        packet["hands"], packet["corners"], packet["ids"] = hands, corners, ids
+        return packet
+
+    def render(self, packet):
+        view = packet["view"]
+        display_frame = packet["frame"]
+        self.poll_result()
+        hands, corners, ids = packet["hands"], packet["corners"], packet["ids"]
+
+        # Place every visible panel first, so hands can go to the nearest one
+        visible = []
+        if ids is not None:
+            for i, marker_id in enumerate(ids):
+                if int(marker_id[0]) in self.marker_ids:
+                    corner_pts = corners[i][0].astype(np.float32)
+                    
+                    # Get bottom right corner of marker (point index 2)
+                    bottom_right = corner_pts[2]
+                    
+                    # Calculate UI top-left position
+                    ui_top_left = bottom_right.copy()
+                    
+                    # Get button coordinates
+                    self.get_button_coords(ui_top_left, int(marker_id[0]), view)
+                    visible.append(self.session(int(marker_id[0]), view))
+
+        hands = [hand for hand in hands or () if len(hand["lmList"]) > 12]
+        assignment = assign_hands(hands, visible)
+
+        for session in view.sessions.values():
+            # Filter the assigned fingertips and turn the pinch into press/hold/release events
+            hand = assignment.get(session)
+            # On the frame's own timeline, so a replay gives the same events at any speed
+            events = session.gestures.update(hand, packet["timestamp"])
+            if session not in assignment:
+                # Marker out of view: only let a pinch in progress end
+                session.handle_release(events)
+                continue
+            pointer = session.gestures.pointer if hand is not None else None
+
+            # Process hand interaction first, so a press lights up on this frame
+            if pointer is not None:
+                pressed_button = session.handle_pointer(pointer, events)
+                if pressed_button is not None:
+                    # The key lights up on this frame; traced until it is shown
+                    packet.setdefault("presses", []).append(pressed_button)
+                    if self.tracer is not None:
+                        self.tracer.instant(f"press {pressed_button} (marker {session.marker_id})", packet)
+
+            # Draw UI
+            with view.profiler.stage("draw_ui"):
+                self.draw_ui(display_frame, session)
+
+            if pointer is not None:
+                cv2.circle(display_frame, (int(pointer[0]), int(pointer[1])), 10,
+                           (0, 0, 255) if session.gestures.pressed else (0, 255, 0), -1)
+            session.handle_release(events)
+
+        # FPS from the rolling frame interval, and the stage table when the HUD is on
+        view.profiler.frame_done()
+        view.profiler.draw(display_frame)
+        view.profiler.maybe_export()
+
+        view.frame_count += 1
+        return packet
+
+    def show(self, packet):
+        # Returns None when the user asks to quit
+        view = packet["view"]
+        if self.output is not None:
+            # Encoded on the server's own threads, and skipped while nobody is watching
+            self.output.publish(packet["frame"], view.index)
+        if self.headless:
+            view.stats.frame_shown(packet)
+            if self.tracer is not None:
+                self.tracer.frame_shown(packet)
+            return packet
+
+        if not view.window_created:
+            # Created lazily so the window belongs to the thread that pumps it
+            cv2.namedWindow(view.window, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(view.window, 800, 600)
+            view.window_created = True
 
-            # Flip frame and resize to 800x600
-            frame = cv2.flip(frame, 1)
-            display_frame = cv2.resize(frame, (800, 600))
-            
-            # Detect hands first
-            hands, _ = self.hand_detector.findHands(display_frame, flipType=False)
-            
-            # Detect markers on the display frame (800x600)
-            corners, ids, _ = self.aruco_detector.detectMarkers(display_frame)
-            
-            if ids is not None:
-                for i, marker_id in enumerate(ids):
-                    if marker_id in [0, 8]:
-                        corner_pts = corners[i][0].astype(np.float32)
-                        
-                        # Get bottom right corner of marker (point index 2)
-                        bottom_right = corner_pts[2]
-                        
-                        # Calculate UI top-left position
-                        ui_top_left = bottom_right.copy()
-                        
-                        # Get button coordinates
-                        button_coords = self.get_button_coords(ui_top_left)
-                        self.active_buttons = button_coords
-                        
-                        # Draw UI
-                        self.draw_ui(display_frame, button_coords)
-                        
-                        # Process hand interaction
-                        if hands:
-                            hand = hands[0]
-                            lmList = hand["lmList"]
-                            
-                            if len(lmList) > 12:
-                                index_tip = lmList[8][0:2]
-                                thumb_tip = lmList[4][0:2]
-                                
-                                distance = np.linalg.norm(np.array(index_tip) - np.array(thumb_tip))
-                                cv2.circle(display_frame, (int(index_tip[0]), int(index_tip[1])), 10, 
-                                          (0, 255, 0) if distance > 30 else (0, 0, 255), -1)
-                                
-                                if self.is_sliding:
-                                    if distance < 30:
-                                        self.update_slider_position(index_tip[0])
-                                    else:
-                                        self.is_sliding = False
-                                        if self.ui_visibility > 0.7:
-                                            self.ui_visibility = 1.0
-                                        elif self.ui_visibility < 0.3:
-                                            self.ui_visibility = 0.0
-                                else:
-                                    if distance < 30:
-                                        pressed_button = self.detect_button_press(index_tip, button_coords)
-                                        if pressed_button == "slider":
-                                            self.is_sliding = True
-                                            self.slider_grab_pos = index_tip[0]
-                                    else:
-                                        for button in button_coords:
-                                            if button.get("is_slider", False):
-                                                continue
-                                            if button["x1"] <= index_tip[0] <= button["x2"] and button["y1"] <= index_tip[1] <= button["y2"]:
-                                                button["state"] = "hover"
-                                                break
-
-            # Display FPS
-            if self.frame_count % 10 == 0:
-                fps = self.frame_count / (time.time() - self.start_time)
-                cv2.putText(display_frame, f"FPS: {int(fps)}", (20, 40), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-                
-            
-            cv2.imshow("AR Calculator", display_frame)
-            
+        with view.profiler.stage("imshow/waitKey"):
+            cv2.imshow(view.window, packet["frame"])
             key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('s'):
-                self.ui_scale_factor = min(3.0, self.ui_scale_factor + 0.1)
-            elif key == ord('a'):
-                self.ui_scale_factor = max(1.0, self.ui_scale_factor - 0.1)
+        view.stats.frame_shown(packet)
+        if self.tracer is not None:
+            self.tracer.frame_shown(packet)
+        return packet if self.handle_key(key) else None
+
+    def idle(self):
+        # No new frame in time (e.g. a camera reconnecting): keep the windows responsive
+        if self.headless:
+            return True
+        return True if self.handle_key(cv2.waitKey(10) & 0xFF) else None
+
+    def handle_key(self, key):
+        # False when the user asks to quit
+        if key == ord('q'):
+            return False
+        elif key == ord('p'):
+            for other in self.views:
+                other.profiler.toggle_hud()
+        elif key == ord('s'):
+            self.ui_scale_factor = min(3.0, self.ui_scale_factor + 0.1)
+        elif key == ord('a'):
+            self.ui_scale_factor = max(1.0, self.ui_scale_factor - 0.1)
+        return True
+
+    def stages(self):
+        stages = [
+            ("capture", self.capture),
+            ("preprocess", self.preprocess),
+            ("inference", self.detect),
+            ("render", self.render),
+            ("display", self.show),
+        ]
+        if self.tracer is not None:
+            stages = [(name, self.tracer.wrap(name, fn)) for name, fn in stages]
+        return stages
+
+    def run(self):
+        try:
+            if len(self.views) > 1:
+                self.run_scheduled()
+            elif self.pipelined:
+                self.run_pipelined()
+            else:
+                capture, preprocess, detect, render, show = [fn for _, fn in self.stages()]
+                while True:
+                    packet = capture()
+                    if packet is None:
+                        break
+                    if packet is NO_FRAME:
+                        if self.idle() is None:
+                            break
+                        continue
+                    packet = render(detect(preprocess(packet)))
+                    if show(packet) is None:
+                        break
+        except KeyboardInterrupt:
+            pass  # Ctrl+C shuts down like 'q'
+        finally:
+            self.shutdown()
+
+    def run_pipelined(self):
+        # Each stage runs on its own thread; frame time is set by the slowest one
+        # The display stage keeps pumping the window while the camera is down, and a stop
+        # reaches the capture thread within capture_timeout
+        pipeline = Pipeline(self.stages(), queue_depth=self.queue_depth, drop_frames=self.drop_frames,
+                            idle=self.idle)
+        pipeline.start()
+        try:
+            pipeline.join()
+        finally:
+            # Waits for the stage threads, so shutdown() never releases what they still use
+            pipeline.stop()
+            self.dropped_frames = pipeline.dropped_frames()
 
-            self.frame_count += 1
+    def run_scheduled(self):
+        # Every stream captures on its own thread; detection and drawing share one worker pool
+        capture, preprocess, detect, render, show = [fn for _, fn in self.stages()]
 
-        self.stream.stop()
-        cv2.destroyAllWindows()
+        def process(view):
+            packet = capture(view)
+            if packet is None or packet is NO_FRAME:
+                return packet  # ended, or nothing new within capture_timeout
+            return render(detect(preprocess(packet)))
+
+        StreamScheduler(self.views, process, show, self.workers, idle=self.idle).run()
+
+    def shutdown(self):
+        closed = set()
+        for view in self.views:
+            view.stream.stop()
+            view.detector.close()
+            if hasattr(view.hand_detector, "close") and id(view.hand_detector) not in closed:
+                closed.add(id(view.hand_detector))
+                view.hand_detector.close()
+            if view.profiler.export_path:
+                view.profiler.export()
+        self.evaluator.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.output is not None:
+            self.output.close()
+        if self.tracer is not None:
+            summary = self.tracer.close()
+            age = summary["frame_age_ms"]
+            print(f"Frame age at display: p50 {age['p50']:.1f} ms, p95 {age['p95']:.1f} ms, "
+                  f"p99 {age['p99']:.1f} ms; {summary['frames_dropped']} dropped, "
+                  f"{summary['frames_duplicated']} duplicated; trace written to {self.tracer.path}")
+        if len(self.views) > 1:
+            for view in self.views:
+                stats = view.stats.summary()
+                print(f"{view.window}: {stats['frames']} frames at {stats['fps']:.1f} FPS, "
+                      f"frame age p50 {stats['age_ms']['p50']:.1f} ms, p95 {stats['age_ms']['p95']:.1f} ms, "
+                      f"{stats['skipped']} skipped")
+        if self.headless:
+            elapsed = time.time() - self.start_time
+            frame_count = sum(view.frame_count for view in self.views)
+            print(f"Processed {frame_count} frames in {elapsed:.2f}s "
+                  f"({frame_count / max(elapsed, 1e-9):.1f} FPS)")
+            if self.dropped_frames:
+                print(f"Dropped frames per stage: {self.dropped_frames}")
+        else:
+            cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    calculator = ARCalculator()
+    parser = argparse.ArgumentParser(description="AR Calculator")
+    parser.add_argument("--record", help="record the session to this file")
+    parser.add_argument("--replay", help="replay a recorded session instead of the camera")
+    parser.add_argument("--use-recorded-detections", action="store_true",
+                        help="skip inference and use the detections stored in the replay")
+    parser.add_argument("--realtime", action="store_true", help="replay at the recorded frame rate")
+    parser.add_argument("--headless", action="store_true", help="run without opening a window")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, preprocess, inference, render and display on separate threads")
+    parser.add_argument("--queue-depth", type=int, default=1,
+                        help="frames buffered between pipeline stages (1 = lowest latency)")
+    parser.add_argument("--no-drop", action="store_true",
+                        help="block instead of dropping stale frames (throughput over latency)")
+    parser.add_argument("--serial-detection", action="store_true",
+                        help="run hand and marker detection back to back instead of concurrently")
+    parser.add_argument("--full-scan-interval", type=int, default=30,
+                        help="frames between full-frame marker scans (0 = scan every frame)")
+    parser.add_argument("--hand-interval", type=int, default=1,
+                        help="run hand inference every N frames and predict landmarks in between")
+    parser.add_argument("--adaptive-hands", action="store_true",
+                        help="pick the hand inference interval from fingertip speed")
+    parser.add_argument("--inference-worker", action="store_true",
+                        help="run hand inference in a worker process instead of in-process")
+    parser.add_argument("--profile-export",
+                        help="append stage timing percentiles to this .csv or JSON-lines file")
+    parser.add_argument("--profile-interval", type=float, default=10.0,
+                        help="seconds between profile exports")
+    parser.add_argument("--hud", action="store_true", help="start with the stage timing HUD shown ('p' toggles)")
+    parser.add_argument("--trace", help="write a Chrome/Perfetto trace of every frame to this file")
+    parser.add_argument("--markers", default="0,8",
+                        help="comma-separated marker ids; each one anchors its own calculator")
+    parser.add_argument("--max-hands", type=int, default=1,
+                        help="hands to track; each is assigned to the nearest calculator")
+    parser.add_argument("--sources",
+                        help="comma-separated camera indices, video files or URLs, one kiosk window each")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker threads shared by all sources (default: one per core)")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="also serve the processed frames as MJPEG over HTTP on this port")
+    parser.add_argument("--serve-quality", type=int, default=80, help="JPEG quality of served frames")
+    parser.add_argument("--serve-host", default="127.0.0.1",
+                        help="address to serve on; 0.0.0.0 exposes the camera, unauthenticated, "
+                             "to every network interface")
+    args = parser.parse_args()
+
+    source = ReplaySource(args.replay, realtime=args.realtime) if args.replay else None
+    if args.sources:
+        source = [int(src) if src.isdigit() else src for src in args.sources.split(",")]
+    recorder = SessionRecorder(args.record) if args.record else None
+    output = MJPEGServer(args.serve, args.serve_host, args.serve_quality) if args.serve else None
+    if output is not None:
+        print(f"Serving processed frames at {output.url}")
+    calculator = ARCalculator(source, recorder, args.use_recorded_detections, args.headless,
+                              args.pipelined, args.queue_depth, not args.no_drop,
+                              not args.serial_detection, args.full_scan_interval,
+                              args.hand_interval, args.adaptive_hands, args.inference_worker,
+                              args.profile_export, args.profile_interval, args.hud, args.trace,
+                              None, [int(m) for m in args.markers.split(",")], args.max_hands,
+                              args.workers, output)
     calculator.run()
\ No newline at end of file
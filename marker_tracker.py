@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+
+
+class MarkerTracker:
+    """Drop-in replacement for ArucoDetector.detectMarkers that avoids full-frame scans.
+
+    After a full detection the four corners of each marker are followed with
+    pyramidal Lucas-Kanade flow, and detectMarkers is re-run only on a padded
+    ROI around them. A full-frame rescan happens every full_scan_interval
+    frames, or immediately when a marker is lost.
+    """
+
+    def __init__(self, aruco_detector, marker_ids=(0, 8), full_scan_interval=30,
+                 roi_padding=0.5, min_padding=20, max_flow_error=1.0):
+        self.aruco_detector = aruco_detector
+        self.marker_ids = None if marker_ids is None else set(marker_ids)
+        self.full_scan_interval = full_scan_interval
+        self.roi_padding = roi_padding  # Fraction of the marker size added on each side
+        self.min_padding = min_padding
+        self.max_flow_error = max_flow_error  # Forward-backward LK disagreement allowed, in pixels
+        self.lk_params = dict(winSize=(21, 21), maxLevel=3,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        self.tracks = {}  # marker id -> (4, 2) float32 corners
+        self.prev_gray = None
+        self.frames_since_scan = 0
+        self.full_scans = 0
+
+    def reset(self):
+        self.tracks = {}
+        self.prev_gray = None
+
+    def _full_scan(self, gray):
+        corners, ids, _ = self.aruco_detector.detectMarkers(gray)
+        self.tracks = {}
+        if ids is not None:
+            for marker_corners, marker_id in zip(corners, ids.reshape(-1)):
+                if self.marker_ids is None or int(marker_id) in self.marker_ids:
+                    self.tracks[int(marker_id)] = marker_corners.reshape(4, 2).astype(np.float32)
+        self.frames_since_scan = 0
+        self.full_scans += 1
+
+    def _flow(self, gray):
+        # Predict every tracked corner with one LK call, and keep only corners that flow back
+        # to where they started: LK reports success even when the marker has left the frame
+        marker_ids = list(self.tracks)
+        points = np.concatenate([self.tracks[m] for m in marker_ids]).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None, **self.lk_params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, moved, None, **self.lk_params)
+        error = np.linalg.norm((back - points).reshape(-1, 2), axis=1)
+        status = (status.reshape(-1) & back_status.reshape(-1)).astype(bool) & (error <= self.max_flow_error)
+        status = status.reshape(-1, 4).all(axis=1)
+        moved = moved.reshape(-1, 4, 2)
+        return {m: moved[i] for i, m in enumerate(marker_ids) if status[i]}
+
+    def _roi(self, corners, shape):
+        x0, y0 = corners.min(axis=0)
+        x1, y1 = corners.max(axis=0)
+        pad = max(self.min_padding, self.roi_padding * max(x1 - x0, y1 - y0))
+        h, w = shape[:2]
+        return (int(max(0, x0 - pad)), int(max(0, y0 - pad)),
+                int(min(w, x1 + pad + 1)), int(min(h, y1 + pad + 1)))
+
+    def _detect_in_roi(self, gray, marker_id, corners):
+        x0, y0, x1, y1 = self._roi(corners, gray.shape)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        found, ids, _ = self.aruco_detector.detectMarkers(gray[y0:y1, x0:x1])
+        if ids is None:
+            return None
+        for marker_corners, found_id in zip(found, ids.reshape(-1)):
+            if int(found_id) == marker_id:
+                return marker_corners.reshape(4, 2) + np.float32([x0, y0])
+        return None
+
+    def _track(self, gray):
+        predicted = self._flow(gray)
+        tracks = {}
+        for marker_id, last in self.tracks.items():
+            guess = predicted.get(marker_id, last)
+            detected = self._detect_in_roi(gray, marker_id, guess)
+            if detected is not None:
+                tracks[marker_id] = detected
+            elif marker_id in predicted:
+                # Detection missed (blur, partial occlusion): keep the flow estimate
+                tracks[marker_id] = guess
+            else:
+                return False
+        self.tracks = tracks
+        self.frames_since_scan += 1
+        return True
+
+    def detectMarkers(self, image):
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        scan_due = self.full_scan_interval <= 0 or self.frames_since_scan >= self.full_scan_interval
+        if not self.tracks or self.prev_gray is None or scan_due or self.prev_gray.shape != gray.shape:
+            self._full_scan(gray)
+        elif not self._track(gray):
+            # Tracking lost: fall back to a full-frame rescan on this frame
+            self._full_scan(gray)
+        self.prev_gray = gray
+
+        if not self.tracks:
+            return (), None, ()
+        marker_ids = sorted(self.tracks)
+        corners = tuple(self.tracks[m].reshape(1, 4, 2) for m in marker_ids)
+        ids = np.array(marker_ids, dtype=np.int32).reshape(-1, 1)
+        return corners, ids, ()
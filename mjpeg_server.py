@@ -0,0 +1,138 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Condition, Thread
+
+import cv2
+
+BOUNDARY = "frame"
+
+
+def send_stream_headers(handler):
+    handler.send_response(200)
+    handler.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+    handler.send_header("Cache-Control", "no-cache")
+    handler.end_headers()
+
+
+def write_part(wfile, jpeg):
+    wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+    wfile.write(jpeg)
+    wfile.write(b"\r\n")
+
+
+class MJPEGServer:
+    """Serves published frames over HTTP as MJPEG to any number of clients.
+
+    publish() only hands the frame to a small encoder pool and returns, so
+    the render loop never waits on JPEG encoding or on the network. Each
+    frame is encoded once and the bytes are shared by every client of its
+    channel. A client thread always sends the newest JPEG, so a slow client
+    just skips frames. Frames are not encoded at all while nobody is
+    watching, or while every encoder is still busy. Channel 0 is served at
+    /video and channel n at /video/<n + 1>.
+
+    There is no authentication, so it listens on localhost only unless another
+    host (e.g. "0.0.0.0" for every interface) is passed in.
+    """
+
+    def __init__(self, port=8081, host="127.0.0.1", quality=80, workers=2):
+        self.quality = quality
+        self.workers = max(1, workers)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="jpeg")
+        self.cond = Condition()
+        self.latest = {}  # channel -> (seq, JPEG bytes)
+        self.clients = {}  # channel -> number of connected clients
+        self.pending = 0
+        self.next_seq = 0
+        self.encoded = 0
+        self.skipped = 0
+        self.closed = False
+        self.httpd = ThreadingHTTPServer((host, port), OutputHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.output = self
+        self.url = f"http://{host if host != '0.0.0.0' else '127.0.0.1'}:{self.httpd.server_port}/video"
+        self.thread = Thread(target=self.httpd.serve_forever, name="mjpeg-server", daemon=True)
+        self.thread.start()
+
+    def publish(self, frame, channel=0):
+        """Encode frame for the channel's clients in the background; False if it was skipped.
+
+        The caller must not draw into frame afterwards.
+        """
+        with self.cond:
+            if self.closed or not self.clients.get(channel):
+                return False
+            if self.pending >= self.workers:
+                self.skipped += 1
+                return False
+            self.pending += 1
+            self.next_seq += 1
+            seq = self.next_seq
+        self.pool.submit(self._encode, frame, channel, seq)
+        return True
+
+    def _encode(self, frame, channel, seq):
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        with self.cond:
+            self.pending -= 1
+            current = self.latest.get(channel)
+            # Encoders can finish out of order; never replace a newer frame
+            if ok and (current is None or seq > current[0]):
+                self.latest[channel] = (seq, jpeg.tobytes())
+                self.encoded += 1
+                self.cond.notify_all()
+
+    def frames(self, channel):
+        """Yield the channel's newest JPEG each time it changes, until the server closes."""
+        with self.cond:
+            self.clients[channel] = self.clients.get(channel, 0) + 1
+        try:
+            last = 0
+            while True:
+                with self.cond:
+                    self.cond.wait_for(lambda: self.closed or self.latest.get(channel, (0,))[0] > last)
+                    if self.closed:
+                        return
+                    last, jpeg = self.latest[channel]
+                yield jpeg
+        finally:
+            with self.cond:
+                self.clients[channel] -= 1
+                if not self.clients[channel]:
+                    # The next viewer should not start on a stale frame
+                    self.latest.pop(channel, None)
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(wait=True)
+
+
+class OutputHandler(BaseHTTPRequestHandler):
+    timeout = 10  # a client that stops reading for this long is disconnected
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path in ("", "/video"):
+            channel = 0
+        elif path.startswith("/video/") and path[7:].isdigit() and int(path[7:]) > 0:
+            channel = int(path[7:]) - 1
+        else:
+            self.send_error(404)
+            return
+        send_stream_headers(self)
+        frames = self.server.output.frames(channel)
+        try:
+            for jpeg in frames:
+                write_part(self.wfile, jpeg)
+        except OSError:
+            pass  # client went away or timed out
+        finally:
+            frames.close()
+
+    def log_message(self, format, *args):
+        pass
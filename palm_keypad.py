@@ -0,0 +1,135 @@
+import math
+
+import cv2
+import numpy as np
+
+from compositor import QuadCompositor
+from gestures import OneEuroFilter
+from panel_renderer import SpriteCache
+
+PALM_POINTS = [0, 5, 9, 13, 17]  # wrist and the four finger knuckles
+
+
+class PalmKeypad:
+    """Calculator keypad pinned to a palm, drawn from a scale-quantized sprite cache.
+
+    The keypad is centred on the palm, turns with it and is `scale` palm
+    lengths (wrist to middle knuckle) wide. Palm size changes every frame,
+    so the static keypad is rendered once per size bucket: buckets are
+    levels_per_octave steps per doubling, the level just above the needed
+    size is used, and warping only ever shrinks it slightly, as with
+    mipmaps. Each frame copies the cached level, draws the display text and
+    hovered key on the copy and blends it over the palm quad only.
+
+    hit_test() maps a point into palm-local keypad coordinates, so keys are
+    found correctly however the hand is turned.
+    """
+
+    labels = [
+        ["7", "8", "9", "/"],
+        ["4", "5", "6", "*"],
+        ["1", "2", "3", "-"],
+        ["C", "0", ".", "+"],
+        ["(", ")", "<", "="],
+    ]
+    rows = len(labels) + 1  # the display takes the top row
+    cols = len(labels[0])
+
+    def __init__(self, scale=2.0, levels_per_octave=4, min_size=64, max_size=768, cache_size=8,
+                 opacity=0.85):
+        self.scale = scale
+        self.levels_per_octave = levels_per_octave
+        self.min_size = min_size
+        self.max_size = max_size
+        self.opacity = opacity
+        self.cache = SpriteCache(cache_size)
+        self.compositor = QuadCompositor()
+        self.filter = OneEuroFilter(min_cutoff=1.0, beta=0.01)
+        self.center = None
+        self.right = None  # unit vector along the keypad's x axis, in pixels
+        self.down = None  # unit vector along the keypad's y axis
+        self.size = 0.0
+
+    def level(self, size):
+        """Side length of the cached rendering used for a keypad of this size."""
+        size = min(max(size, self.min_size), self.max_size)
+        step = math.ceil(self.levels_per_octave * math.log2(size / self.min_size) - 1e-9)
+        return int(round(self.min_size * 2 ** (step / self.levels_per_octave)))
+
+    def place(self, landmarks, timestamp):
+        """Anchor the keypad to a palm, given its (21, 2+) pixel landmarks."""
+        points = self.filter.filter(np.asarray(landmarks, np.float32)[PALM_POINTS, :2], timestamp)
+        up = points[2] - points[0]  # wrist to middle knuckle
+        palm = float(np.linalg.norm(up))
+        if palm < 1.0:
+            self.center = None
+            return
+        self.center = points.mean(axis=0)
+        self.down = -up / palm  # the keypad's top faces the fingers
+        self.right = np.float32([self.down[1], -self.down[0]])
+        self.size = palm * self.scale
+
+    def hide(self):
+        self.center = None
+        self.filter.reset()
+
+    def quad(self):
+        half_x, half_y = self.right * (self.size / 2), self.down * (self.size / 2)
+        c = self.center
+        return np.float32([c - half_x - half_y, c + half_x - half_y, c + half_x + half_y, c - half_x + half_y])
+
+    def hit_test(self, point):
+        """Label of the key under point, or None; the point is projected onto the palm's axes."""
+        if self.center is None:
+            return None
+        offset = np.asarray(point, np.float32)[:2] - self.center
+        x = float(offset @ self.right) / self.size + 0.5
+        y = float(offset @ self.down) / self.size + 0.5
+        if not (0.0 <= x < 1.0 and 0.0 <= y < 1.0):
+            return None
+        row, col = int(y * self.rows), int(x * self.cols)
+        if row == 0:
+            return None  # display
+        return self.labels[row - 1][col]
+
+    def _cell(self, size, row, col):
+        cell_w, cell_h = size / self.cols, size / self.rows
+        return (int(col * cell_w) + 2, int(row * cell_h) + 2,
+                int((col + 1) * cell_w) - 3, int((row + 1) * cell_h) - 3)
+
+    def _render(self, size):
+        image = np.full((size, size, 3), (40, 40, 40), np.uint8)
+        font_scale = size / 360
+        thickness = max(1, int(round(size / 180)))
+        x1, y1, x2, y2 = self._cell(size, 0, 0)
+        cv2.rectangle(image, (x1, y1), (self._cell(size, 0, self.cols - 1)[2], y2), (20, 20, 20), -1)
+        for r, row in enumerate(self.labels):
+            for c, label in enumerate(row):
+                x1, y1, x2, y2 = self._cell(size, r + 1, c)
+                cv2.rectangle(image, (x1, y1), (x2, y2), (100, 100, 100), -1)
+                (text_w, text_h), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+                cv2.putText(image, label, ((x1 + x2 - text_w) // 2, (y1 + y2 + text_h) // 2),
+                            cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
+        return image
+
+    def draw(self, frame, text="", hover=None):
+        if self.center is None:
+            return
+        size = self.level(self.size)
+        # Copy the cached level: it is small, and the cached one stays clean
+        image = self.cache.get(size, lambda: self._render(size)).copy()
+        font_scale = size / 360
+        thickness = max(1, int(round(size / 180)))
+        if hover is not None:
+            for r, row in enumerate(self.labels):
+                if hover in row:
+                    x1, y1, x2, y2 = self._cell(size, r + 1, row.index(hover))
+                    cv2.rectangle(image, (x1, y1), (x2, y2), (173, 216, 230), -1)
+                    (text_w, text_h), _ = cv2.getTextSize(hover, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+                    cv2.putText(image, hover, ((x1 + x2 - text_w) // 2, (y1 + y2 + text_h) // 2),
+                                cv2.FONT_HERSHEY_SIMPLEX, font_scale, (40, 40, 40), thickness, cv2.LINE_AA)
+        if text:
+            x1, y1, x2, y2 = self._cell(size, 0, 0)
+            cv2.putText(image, text[-12:], (x1 + 4, y2 - 6), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                        (255, 255, 255), thickness, cv2.LINE_AA)
+        self.compositor.blend(frame, image, self.quad(), self.opacity)
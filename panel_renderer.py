@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from threading import Lock
+
+import cv2
+import numpy as np
+
+from button_layout import DISPLAY, SLIDER
+
+
+class Sprite:
+    """Premultiplied BGRA image that can be alpha-blended into a frame region.
+
+    Color and alpha are kept in 8.8 fixed point so blending is a single
+    integer multiply-add per channel.
+    """
+
+    def __init__(self, premultiplied, alpha, offset=(0, 0)):
+        # (h, w, 3) uint16: color * alpha * 256, plus 128 for rounding
+        self.premultiplied = (np.rint(premultiplied * 256) + 128).astype(np.uint16)
+        # (h, w, 3) uint16: (1 - alpha) * 256
+        self.inv_alpha = np.repeat(np.floor((1.0 - alpha) * 256), 3, axis=2).astype(np.uint16)
+        self.offset = offset  # position relative to the anchor it is drawn at
+        self.height, self.width = alpha.shape[:2]
+        # Fully opaque-or-empty sprites are copied instead of blended
+        self.mask = None
+        if np.all((alpha == 0) | (alpha == 1)):
+            self.mask = (alpha[..., 0] > 0).astype(np.uint8)
+            self.color = premultiplied.astype(np.uint8)
+
+
+def rasterize(draw, width, height, opacity=1.0, offset=(0, 0)):
+    """Render draw(canvas) once into a Sprite of the given size.
+
+    draw is called on a black and on a white canvas; the difference between
+    the two recovers per-pixel coverage, so any cv2 drawing code (including
+    addWeighted glows) becomes an exact color + alpha sprite.
+    """
+    black = np.zeros((height, width, 3), np.uint8)
+    white = np.full((height, width, 3), 255, np.uint8)
+    draw(black)
+    draw(white)
+    diff = white.astype(np.float32) - black.astype(np.float32)
+    alpha = (1.0 - diff.max(axis=2, keepdims=True) / 255.0) * opacity
+    premultiplied = black.astype(np.float32) * opacity
+    return Sprite(premultiplied, alpha, offset)
+
+
+def blend_sprite(frame, sprite, x, y):
+    """Blend sprite into frame in place with its top-left at (x, y), clipped to the frame."""
+    x, y = x + sprite.offset[0], y + sprite.offset[1]
+    frame_h, frame_w = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sprite.width, frame_w), min(y + sprite.height, frame_h)
+    if x0 >= x1 or y0 >= y1:
+        return
+    sx, sy = x0 - x, y0 - y
+    sw, sh = x1 - x0, y1 - y0
+    roi = frame[y0:y1, x0:x1]
+    if sprite.mask is not None:
+        cv2.copyTo(sprite.color[sy:sy + sh, sx:sx + sw], sprite.mask[sy:sy + sh, sx:sx + sw], roi)
+        return
+    blended = roi * sprite.inv_alpha[sy:sy + sh, sx:sx + sw]
+    blended += sprite.premultiplied[sy:sy + sh, sx:sx + sw]
+    blended >>= 8
+    roi[:] = blended
+
+
+class SpriteCache:
+    """Small LRU cache of rendered sprites, safe to share between render threads."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, key, build):
+        with self.lock:
+            sprite = self.sprites.get(key)
+            if sprite is not None:
+                self.sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+            self.misses += 1
+        # Built outside the lock; two threads missing the same key just render it twice
+        sprite = build()
+        with self.lock:
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.maxsize:
+                self.sprites.popitem(last=False)
+        return sprite
+
+
+class CalculatorPanelRenderer:
+    """Draws the ARCalculator keypad from cached sprites.
+
+    A sprite is rendered once per (visibility step, button states, display
+    text) and blended only over the panel's bounding rectangle, instead of
+    copying and blending the whole frame every time.
+    """
+
+    glow = 3  # hover glow extends this far around a button
+    opacity = 0.5
+
+    def __init__(self, calculator, cache_size=64):
+        self.calc = calculator
+        self.cache = SpriteCache(cache_size)
+
+    def draw(self, frame, layout, current_input, current_result, ui_visibility, preview=""):
+        if not len(layout):
+            return
+        input_text = current_input if len(current_input) < 20 else "..." + current_input[-17:]
+        # Panel is anchored at the display box when visible, else at the slider
+        anchor = layout.buttons[DISPLAY if len(layout) > 1 else SLIDER]
+        ax, ay = int(anchor["x1"]), int(anchor["y1"])
+        if ui_visibility <= 0:
+            visibility_step = 0
+        else:
+            visibility_step = 1 if ui_visibility < 0.5 else 2
+        key = (visibility_step, layout.slider_rect[0] - ax,
+               layout.states[:len(layout)].tobytes(), input_text, current_result, preview)
+        sprite = self.cache.get(key, lambda: self._render(layout.as_dicts(), ax, ay, input_text,
+                                                          current_result, ui_visibility, preview))
+        blend_sprite(frame, sprite, ax, ay)
+
+    def _render(self, button_coords, ax, ay, input_text, current_result, ui_visibility, preview):
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        x0 = min(b["x1"] for b in button_coords) - self.glow
+        y0 = min(b["y1"] for b in button_coords) - self.glow
+        x1 = max(b["x2"] for b in button_coords) + self.glow + 1
+        y1 = max(b["y2"] for b in button_coords) + self.glow + 1
+        for button in button_coords:
+            if button["label"] == "display":
+                # Long input may run past the display box
+                for text in (input_text, f"= {current_result}", f"= {preview}"):
+                    (text_w, _), _ = cv2.getTextSize(text, font, 0.8, 2)
+                    x1 = max(x1, button["x1"] + 10 + text_w + 2)
+        local = []
+        for button in button_coords:
+            shifted = dict(button)
+            for k in ("x1", "x2"):
+                shifted[k] -= x0
+            for k in ("y1", "y2"):
+                shifted[k] -= y0
+            local.append(shifted)
+
+        def draw(overlay):
+            self._draw_panel(overlay, local, input_text, current_result, ui_visibility, preview)
+
+        return rasterize(draw, x1 - x0, y1 - y0, self.opacity, (x0 - ax, y0 - ay))
+
+    def _draw_panel(self, overlay, button_coords, input_text, current_result, ui_visibility, preview):
+        calc = self.calc
+        for button in button_coords:
+            if button["label"] == "slider":
+                # Draw slider button
+                color = calc.button_colors["slider"]
+                cv2.rectangle(overlay, (button["x1"], button["y1"]),
+                              (button["x2"], button["y2"]), color[:3], -1)
+                cv2.rectangle(overlay, (button["x1"], button["y1"]),
+                              (button["x2"], button["y2"]), (0, 0, 0), 2)
+
+                # Draw slider arrow
+                arrow_size = 15
+                center_x = button["x1"] + calc.slider_width // 2
+                center_y = button["y1"] + (button["y2"] - button["y1"]) // 2
+                if ui_visibility < 0.5:
+                    pts = np.array([[center_x, center_y],
+                                    [center_x + arrow_size, center_y - arrow_size],
+                                    [center_x + arrow_size, center_y + arrow_size]])
+                else:
+                    pts = np.array([[center_x, center_y],
+                                    [center_x - arrow_size, center_y - arrow_size],
+                                    [center_x - arrow_size, center_y + arrow_size]])
+                cv2.fillPoly(overlay, [pts], (0, 0, 0))
+
+            elif button["label"] == "display":
+                # Draw display box
+                color = calc.button_colors["display"]
+                cv2.rectangle(overlay, (button["x1"], button["y1"]),
+                              (button["x2"], button["y2"]), color[:3], -1)
+                cv2.rectangle(overlay, (button["x1"], button["y1"]),
+                              (button["x2"], button["y2"]), (0, 0, 0), 2)
+
+                # Display input and result
+                cv2.putText(overlay, input_text,
+                            (button["x1"] + 10, button["y1"] + 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8,
+                            (255, 255, 255), 2)
+
+                if current_result:
+                    cv2.putText(overlay, f"= {current_result}",
+                                (button["x1"] + 10, button["y1"] + 60),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.8,
+                                (200, 200, 0), 2)
+                elif preview:
+                    # Live result of the input typed so far
+                    cv2.putText(overlay, f"= {preview}",
+                                (button["x1"] + 10, button["y1"] + 60),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.8,
+                                (150, 150, 150), 2)
+            else:
+                color = calc.button_colors[button["state"]]
+
+                # Add glow effect for hover state
+                if button["state"] == "hover":
+                    glow = overlay.copy()
+                    cv2.rectangle(glow,
+                                  (button["x1"] - self.glow, button["y1"] - self.glow),
+                                  (button["x2"] + self.glow, button["y2"] + self.glow),
+                                  (173, 216, 230), -1)
+                    cv2.addWeighted(overlay, 0.7, glow, 0.3, 0, overlay)
+
+                # Draw button
+                cv2.rectangle(overlay, (button["x1"], button["y1"]),
+                              (button["x2"], button["y2"]), color[:3], -1)
+                cv2.rectangle(overlay, (button["x1"], button["y1"]),
+                              (button["x2"], button["y2"]), (0, 0, 0), 2)
+
+                # Draw label
+                text_size = cv2.getTextSize(button["label"], cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+                text_x = button["x1"] + (calc.button_width - text_size[0]) // 2
+                text_y = button["y1"] + (calc.button_height + text_size[1]) // 2
+                cv2.putText(overlay, button["label"], (text_x, text_y),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
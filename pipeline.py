@@ -0,0 +1,155 @@
+import time
+from collections import deque
+from threading import Condition, Event, Thread, current_thread
+
+# Returned by a source that had nothing new within its timeout; the pipeline checks for stop and asks again
+NO_FRAME = object()
+
+
+class LatestQueue:
+    """Bounded hand-off between stages.
+
+    With drop=True a full queue discards its oldest item so consumers always
+    see the freshest frame (latest-wins). With drop=False the producer waits
+    instead, so every frame is processed at the cost of extra latency.
+    """
+
+    def __init__(self, maxsize=1, drop=True):
+        self.items = deque()
+        self.maxsize = max(1, maxsize)
+        self.drop = drop
+        self.dropped = 0
+        self.closed = False
+        self.cond = Condition()
+
+    def put(self, item):
+        with self.cond:
+            while len(self.items) >= self.maxsize and not self.closed:
+                if self.drop:
+                    self.items.popleft()
+                    self.dropped += 1
+                else:
+                    self.cond.wait()
+            if self.closed:
+                return False
+            self.items.append(item)
+            self.cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        # Returns None once the queue is closed and drained
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items or self.closed, timeout):
+                return None
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self.cond.notify_all()
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class Pipeline:
+    """Runs each stage on its own thread, chained by LatestQueues.
+
+    stages is a list of (name, fn). The first fn is a source called with no
+    arguments; every other fn receives the previous stage's output. Returning
+    None from the source or the final stage stops the pipeline; returning None
+    from a middle stage just drops that item.
+
+    A source that waits with a timeout returns NO_FRAME when nothing came, so
+    stop() takes effect without a new item. idle, if given, is called on the
+    final stage's thread whenever no item reaches it for idle_interval
+    seconds (e.g. to keep a window responsive while a camera is down), and
+    stops the pipeline by returning None.
+    """
+
+    def __init__(self, stages, queue_depth=1, drop_frames=True, idle=None, idle_interval=0.1):
+        self.stages = stages
+        self.queues = [LatestQueue(queue_depth, drop_frames) for _ in stages[1:]]
+        self.idle = idle
+        self.idle_interval = idle_interval
+        self.stopped = Event()
+        self.threads = []
+        self.error = None
+
+    def _source_loop(self, fn, inq, outq):
+        while not self.stopped.is_set():
+            item = fn()
+            if item is NO_FRAME:
+                continue
+            if item is None or not outq.put(item):
+                break
+
+    def _stage_loop(self, fn, inq, outq):
+        # Runs until the upstream queue is closed and drained
+        idle = self.idle if outq is None else None
+        while True:
+            item = inq.get(None if idle is None else self.idle_interval)
+            if item is None:
+                if idle is None or (inq.closed and not inq.items):
+                    break
+                if idle() is None:
+                    self._signal_stop()
+                    break
+                continue
+            result = fn(item)
+            if outq is not None:
+                if result is not None:
+                    outq.put(result)
+            elif result is None:
+                self._signal_stop()
+                break
+
+    def _worker(self, name, loop, fn, inq, outq):
+        try:
+            loop(fn, inq, outq)
+        except Exception as e:
+            self.error = (name, e)
+            self._signal_stop()
+        finally:
+            # Propagate end-of-stream to the next stage
+            if outq is not None:
+                outq.close()
+
+    def start(self):
+        for index, (name, fn) in enumerate(self.stages):
+            inq = self.queues[index - 1] if index > 0 else None
+            outq = self.queues[index] if index < len(self.queues) else None
+            loop = self._stage_loop if inq is not None else self._source_loop
+            thread = Thread(target=self._worker, args=(name, loop, fn, inq, outq), name=name, daemon=True)
+            self.threads.append(thread)
+            thread.start()
+        return self
+
+    def _signal_stop(self):
+        self.stopped.set()
+        for q in self.queues:
+            q.close()
+
+    def stop(self, timeout=2.0):
+        """Stop every stage and wait up to timeout seconds for their threads to exit.
+
+        After this returns the stages no longer touch the capture or the
+        detectors, so they can be released; a thread stuck in native code
+        past the timeout is left behind (they are daemons).
+        """
+        self._signal_stop()
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            if thread is not current_thread():
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+        if self.error is not None:
+            name, e = self.error
+            raise RuntimeError(f"Pipeline stage '{name}' failed") from e
+
+    def dropped_frames(self):
+        return {name: q.dropped for (name, _), q in zip(self.stages[1:], self.queues)}
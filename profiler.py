@@ -0,0 +1,200 @@
+import csv
+import json
+import os
+import time
+from collections import deque
+from threading import Lock
+
+import cv2
+import numpy as np
+
+
+class LatencyHistogram:
+    """HDR-style histogram of durations in microseconds.
+
+    Values are bucketed log-linearly: each power of two is split into
+    linear sub-buckets, so every recorded value keeps better than 2%
+    relative precision from 1 us up to max_seconds with a fixed, small
+    array of counts that can be summed to merge histograms.
+    """
+
+    def __init__(self, sub_bits=7, max_seconds=60.0):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.max_value = int(max_seconds * 1e6)
+        self.counts = np.zeros(self.index(self.max_value) + 1, np.int64)
+        self.total = 0
+        self.max = 0
+
+    def index(self, value):
+        shift = max(0, value.bit_length() - self.sub_bits)
+        return (shift << self.sub_bits) + (value >> shift)
+
+    def value_at(self, index):
+        # Upper edge of a bucket, the largest value it can hold
+        shift, sub = divmod(index, self.sub_count)
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds):
+        value = min(self.max_value, max(0, int(seconds * 1e6)))
+        self.counts[self.index(value)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total = 0
+        self.max = 0
+
+    def percentiles(self, quantiles, counts=None):
+        """Durations in seconds at each quantile (0-1) of counts (default: this histogram)."""
+        counts = self.counts if counts is None else counts
+        cumulative = np.cumsum(counts)
+        if not len(cumulative) or cumulative[-1] == 0:
+            return [0.0 for _ in quantiles]
+        ranks = np.ceil(np.asarray(quantiles) * cumulative[-1]).clip(1, None)
+        indices = np.searchsorted(cumulative, ranks)
+        return [self.value_at(int(i)) / 1e6 for i in indices]
+
+
+class StageProfiler:
+    """Rolling per-stage timings with percentiles, an on-screen HUD and export.
+
+    Each stage keeps `slices` histograms covering `window` seconds in total;
+    the oldest slice is cleared as time moves on, so percentiles describe
+    the last few seconds rather than everything since startup. frame_done()
+    records the time between frames, which gives the FPS shown on screen.
+    summary() is written to export_path every export_interval seconds, as
+    CSV rows or one JSON object per line depending on the file extension.
+    """
+
+    quantiles = (0.5, 0.95, 0.99)
+
+    def __init__(self, window=5.0, slices=5, export_path=None, export_interval=10.0, hud=False):
+        self.slice_seconds = window / slices
+        self.slices = slices
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.hud = hud
+        self.stages = {}  # name -> deque of LatencyHistogram, newest last
+        self.lock = Lock()
+        self.slice_start = time.perf_counter()
+        self.last_frame = None
+        self.last_export = time.perf_counter()
+        self.hud_lines = []
+        self.hud_updated = 0.0
+
+    def _histograms(self, name):
+        histograms = self.stages.get(name)
+        if histograms is None:
+            histograms = self.stages[name] = deque([LatencyHistogram() for _ in range(self.slices)],
+                                                   maxlen=self.slices)
+        return histograms
+
+    def _rotate(self, now):
+        # Retire the oldest slice of every stage once the current slice is full
+        while now - self.slice_start >= self.slice_seconds:
+            self.slice_start += self.slice_seconds
+            for histograms in self.stages.values():
+                oldest = histograms.popleft()
+                oldest.reset()
+                histograms.append(oldest)
+            if now - self.slice_start >= self.slice_seconds * self.slices:
+                self.slice_start = now
+
+    def record(self, name, seconds):
+        with self.lock:
+            self._rotate(time.perf_counter())
+            self._histograms(name)[-1].record(seconds)
+
+    def stage(self, name):
+        """Context manager that records the time spent in its block under name."""
+        return _StageTimer(self, name)
+
+    def frame_done(self):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.record("frame", now - self.last_frame)
+        self.last_frame = now
+
+    def summary(self):
+        """{stage: {"count", "p50", "p95", "p99", "max"}} over the window, in milliseconds."""
+        with self.lock:
+            self._rotate(time.perf_counter())
+            result = {}
+            for name, histograms in self.stages.items():
+                counts = sum(h.counts for h in histograms)
+                p50, p95, p99 = histograms[-1].percentiles(self.quantiles, counts)
+                result[name] = {
+                    "count": int(counts.sum()),
+                    "p50": round(p50 * 1e3, 3), "p95": round(p95 * 1e3, 3), "p99": round(p99 * 1e3, 3),
+                    "max": round(max(h.max for h in histograms) / 1e3, 3),
+                }
+            return result
+
+    def fps(self, summary=None):
+        frame = (summary or self.summary()).get("frame")
+        if not frame or not frame["count"] or frame["p50"] <= 0:
+            return 0.0
+        return 1e3 / frame["p50"]
+
+    def draw(self, frame, refresh=0.5):
+        """Draw the FPS, plus the per-stage table while the HUD is toggled on."""
+        now = time.perf_counter()
+        if now - self.hud_updated >= refresh:
+            # Percentiles change slowly; recompute the text a few times a second
+            summary = self.summary()
+            self.hud_lines = [f"FPS: {self.fps(summary):.0f}"]
+            if self.hud:
+                self.hud_lines.append(f"{'stage':<14}{'p50':>7}{'p95':>7}{'p99':>7}")
+                for name, stats in summary.items():
+                    self.hud_lines.append(f"{name:<14}{stats['p50']:7.1f}{stats['p95']:7.1f}{stats['p99']:7.1f}")
+            self.hud_updated = now
+        for i, line in enumerate(self.hud_lines):
+            scale, color = (0.8, (0, 255, 0)) if i == 0 else (0.45, (255, 255, 255))
+            cv2.putText(frame, line, (20, 40 + 20 * i + (8 if i else 0)),
+                        cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2 if i == 0 else 1)
+
+    def toggle_hud(self):
+        self.hud = not self.hud
+        self.hud_updated = 0.0
+
+    def maybe_export(self):
+        if self.export_path and time.perf_counter() - self.last_export >= self.export_interval:
+            self.export()
+
+    def export(self, path=None):
+        """Append the current summary to a .csv file, or as a JSON line to any other file."""
+        path = path or self.export_path
+        self.last_export = time.perf_counter()
+        summary = self.summary()
+        timestamp = time.time()
+        if path.endswith(".csv"):
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(["timestamp", "stage", "count", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                for name, stats in summary.items():
+                    writer.writerow([f"{timestamp:.3f}", name, stats["count"], f"{stats['p50']:.3f}",
+                                     f"{stats['p95']:.3f}", f"{stats['p99']:.3f}", f"{stats['max']:.3f}"])
+        else:
+            with open(path, "a") as f:
+                f.write(json.dumps({"timestamp": timestamp, "stages": summary}) + "\n")
+
+
+class _StageTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+
+from hand_utils import draw_hand, hand_array, make_hand
+
+
+class ScaledHandDetector:
+    """Drop-in for HandDetector.findHands that runs the model on a downscaled copy.
+
+    Hand landmarks are just as usable at 320x240 as at display size, so the
+    frame is shrunk to `size` for inference and the landmarks (and the
+    bbox/center built from them) are scaled back to the caller's image.
+    """
+
+    def __init__(self, hand_detector, size=(320, 240)):
+        self.hand_detector = hand_detector
+        self.size = size
+
+    def findHands(self, img, draw=True, flipType=True):
+        h, w = img.shape[:2]
+        if (w, h) == tuple(self.size):
+            return self.hand_detector.findHands(img, draw=draw, flipType=flipType)
+        small = cv2.resize(img, self.size, interpolation=cv2.INTER_AREA)
+        result = self.hand_detector.findHands(small, draw=False, flipType=flipType)
+        small_hands = result[0] if isinstance(result, tuple) else result
+        # z is scaled like x, as cvzone does
+        scale = np.float32([w / self.size[0], h / self.size[1], w / self.size[0]])
+        hands = []
+        for small_hand in small_hands:
+            hand = make_hand(hand_array(small_hand) * scale, small_hand.get("type", "Unknown"))
+            hands.append(hand)
+            if draw:
+                draw_hand(img, hand)
+        return (hands, img) if draw else hands
+
+
+class ScaledMarkerDetector:
+    """Drop-in for ArucoDetector.detectMarkers that detects at a reduced scale.
+
+    Markers are found on a copy resized by `scale`, then their corners are
+    mapped back and refined with cornerSubPix on the full-resolution image,
+    so the UI anchor keeps display-resolution accuracy. Images whose short
+    side would drop below min_side (e.g. MarkerTracker's ROI crops) are
+    detected at full size.
+    """
+
+    def __init__(self, aruco_detector, scale=0.5, refine=True, min_side=120):
+        self.aruco_detector = aruco_detector
+        self.scale = scale
+        self.refine = refine
+        self.min_side = min_side
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+
+    def detectMarkers(self, image):
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if self.scale >= 1 or min(gray.shape[:2]) * self.scale < self.min_side:
+            return self.aruco_detector.detectMarkers(gray)
+        small = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        corners, ids, rejected = self.aruco_detector.detectMarkers(small)
+        if ids is None or not len(corners):
+            return corners, ids, rejected
+
+        points = np.concatenate([c.reshape(4, 2) for c in corners]).astype(np.float32)
+        # Corner (0, 0) of a pixel scales to (0, 0), so centers shift by half a pixel
+        points = (points + 0.5) / self.scale - 0.5
+        if self.refine:
+            # Search about one downscaled pixel around each estimate
+            half = int(np.ceil(1 / self.scale)) + 1
+            points = cv2.cornerSubPix(gray, points.reshape(-1, 1, 2), (half, half), (-1, -1),
+                                      self.criteria)
+        points = points.reshape(-1, 1, 4, 2)
+        return tuple(points[i] for i in range(len(points))), ids, rejected
+
+
+def open_native_capture(src, width, height, fps=30):
+    """Open a camera and ask it for the display resolution directly.
+
+    Returns the capture and the (width, height) it actually delivers; the
+    caller only needs to resize when that differs from what it asked for.
+    """
+    cap = cv2.VideoCapture(src)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    return cap, size
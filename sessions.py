@@ -0,0 +1,208 @@
+from collections import deque
+from threading import RLock
+
+import numpy as np
+
+from button_layout import ButtonLayout, FIRST_KEY, HOVER, PRESSED, SLIDER
+from calc_engine import LiveEvaluator
+from gestures import GestureEngine
+
+
+class CalculatorSession:
+    """State of the calculator anchored to one marker: one user's keypad.
+
+    Each session has its own input, result, slider position, layout cache
+    and gesture engine; the hand assigned to it each frame drives it.
+    """
+
+    def __init__(self, calc, marker_id):
+        self.calc = calc
+        self.marker_id = marker_id
+        self.layout = ButtonLayout(calc.button_labels, calc.button_width, calc.button_height,
+                                   calc.button_spacing, calc.display_height, calc.slider_width)
+        self.current_input = ""
+        self.current_result = ""
+        self.live_evaluator = LiveEvaluator()
+        self.evaluating = False
+        self.ui_visibility = 0.0
+        self.is_sliding = False
+        self.slider_grab_pos = 0
+        # Pinch thresholds are fractions of the palm length, with hysteresis instead of a debounce
+        self.gestures = GestureEngine(pinch=(4, 8), pointer=8, press_ratio=0.25, release_ratio=0.35)
+        self.held_button = None  # key index pressed by the current pinch
+
+    def place(self, ui_top_left):
+        # Only recomputed when the anchor or visibility moves
+        self.layout.update(ui_top_left, self.ui_visibility)
+        return self.layout
+
+    def bounds(self):
+        """(x1, y1, x2, y2) around the slider and, when open, the keypad."""
+        buttons = self.layout.buttons[:len(self.layout)]
+        return (int(buttons["x1"].min()), int(buttons["y1"].min()),
+                int(buttons["x2"].max()), int(buttons["y2"].max()))
+
+    def detect_button_press(self, fingertip_pos):
+        # Called once per pinch "press" event, so no debounce is needed
+        layout = self.layout
+        index = layout.hit_test(fingertip_pos[0], fingertip_pos[1])
+        if index == SLIDER:
+            self.is_sliding = True
+            self.slider_grab_pos = fingertip_pos[0]
+            return "slider"
+        if index < FIRST_KEY:
+            # Nothing, or the display box, under the fingertip
+            return None
+
+        layout.states[index] = PRESSED
+        self.held_button = index
+        pressed_button = layout.labels[index]
+
+        # Handle special buttons
+        if pressed_button == "=":
+            self.calculate_result()
+        elif pressed_button == "C":
+            self.current_input = ""
+            self.current_result = ""
+            self.calc.evaluations.cancel(self)
+        elif pressed_button == "<":
+            self.current_input = self.current_input[:-1]
+        else:
+            self.current_input += pressed_button
+
+        return pressed_button
+
+    def update_slider_position(self, current_pos):
+        if not self.is_sliding:
+            return
+
+        delta = current_pos - self.slider_grab_pos
+        self.slider_grab_pos = current_pos
+
+        self.ui_visibility += delta / self.layout.total_width
+        self.ui_visibility = max(0.0, min(1.0, self.ui_visibility))
+
+    def calculate_result(self):
+        if not self.current_input:
+            return
+
+        # Evaluated in the shared worker process; the result arrives via set_result()
+        self.current_result = ""
+        self.calc.evaluations.submit(self)
+
+    def set_result(self, result):
+        self.current_result = result
+        self.evaluating = False
+
+    def handle_pointer(self, pointer, events):
+        """Apply this frame's gesture events; returns the key pressed, if any."""
+        pressed_button = None
+        if not self.is_sliding and any(event.kind == "press" for event in events):
+            pressed_button = self.detect_button_press(pointer)
+            if pressed_button == "slider":
+                pressed_button = None
+
+        if self.is_sliding:
+            if self.gestures.pressed:
+                self.update_slider_position(pointer[0])
+            return pressed_button
+        index = self.layout.hit_test(pointer[0], pointer[1])
+        if index >= FIRST_KEY:
+            if not self.gestures.pressed:
+                self.layout.states[index] = HOVER
+            elif self.held_button == index:
+                # Keep the key lit while the pinch that pressed it is held over it
+                self.layout.states[index] = PRESSED
+        return pressed_button
+
+    def handle_release(self, events):
+        if not any(event.kind == "release" for event in events):
+            return
+        self.held_button = None
+        if self.is_sliding:
+            self.is_sliding = False
+            if self.ui_visibility > 0.7:
+                self.ui_visibility = 1.0
+            elif self.ui_visibility < 0.3:
+                self.ui_visibility = 0.0
+
+
+def assign_hands(hands, sessions, max_distance=250.0):
+    """Give each visible session the nearest free hand, or None.
+
+    The distance from every index fingertip to every panel rectangle is one
+    vectorized computation; pairs are then taken greedily, nearest first,
+    and hands farther than max_distance from every panel stay unassigned.
+    """
+    assignment = {session: None for session in sessions}
+    if not hands or not sessions:
+        return assignment
+    tips = np.array([hand["lmList"][8][:2] for hand in hands], dtype=np.float32)  # (H, 2)
+    boxes = np.array([session.bounds() for session in sessions], dtype=np.float32)  # (S, 4)
+    # Per-axis distance outside each box, zero inside
+    dx = np.maximum(np.maximum(boxes[None, :, 0] - tips[:, None, 0], tips[:, None, 0] - boxes[None, :, 2]), 0)
+    dy = np.maximum(np.maximum(boxes[None, :, 1] - tips[:, None, 1], tips[:, None, 1] - boxes[None, :, 3]), 0)
+    distance = np.hypot(dx, dy)  # (H, S)
+
+    used_hands, used_sessions = set(), set()
+    for flat in np.argsort(distance, axis=None):
+        h, s = divmod(int(flat), len(sessions))
+        if distance[h, s] > max_distance:
+            break
+        if h in used_hands or s in used_sessions:
+            continue
+        used_hands.add(h)
+        used_sessions.add(s)
+        assignment[sessions[s]] = hands[h]
+    return assignment
+
+
+class EvaluationQueue:
+    """Shares one evaluation worker between sessions, one job at a time.
+
+    Sessions of different streams render on different threads, so every
+    method holds the lock.
+    """
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.waiting = deque()  # (session, input text)
+        self.owner = None
+        self.lock = RLock()
+
+    def _drop(self, session):
+        self.waiting = deque(job for job in self.waiting if job[0] is not session)
+
+    def submit(self, session):
+        with self.lock:
+            # A newer "=" from the same session supersedes its earlier job
+            self.cancel(session)
+            session.evaluating = True
+            self.waiting.append((session, session.current_input))
+            self._next()
+
+    def cancel(self, session):
+        with self.lock:
+            session.evaluating = False
+            self._drop(session)
+            if session is self.owner:
+                self.evaluator.cancel()
+                self.owner = None
+                self._next()
+
+    def _next(self):
+        if self.owner is None and self.waiting:
+            self.owner, text = self.waiting.popleft()
+            self.evaluator.submit(text)
+
+    def poll(self):
+        if self.owner is None:
+            return
+        with self.lock:
+            if self.owner is None:
+                return
+            result = self.evaluator.poll()
+            if result is not None:
+                self.owner.set_result(result)
+                self.owner = None
+                self._next()
@@ -0,0 +1,101 @@
+import argparse
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+from cv2 import aruco
+
+from mjpeg_server import send_stream_headers, write_part
+
+
+def test_pattern(width=640, height=480, marker_id=0):
+    """Returns frame(index): a moving ArUco marker with the frame number, like a phone camera app."""
+    dictionary = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
+    # Mirrored, because the calculator flips every frame
+    marker = cv2.cvtColor(cv2.flip(aruco.generateImageMarker(dictionary, marker_id, 110), 1),
+                          cv2.COLOR_GRAY2BGR)
+    background = np.random.default_rng(0).integers(150, 210, (height, width, 3), dtype=np.uint8)
+
+    def frame(index):
+        image = background.copy()
+        x = int(width * 0.55 + 40 * np.sin(index * 0.03))
+        y = int(height * 0.12 + 15 * np.sin(index * 0.045))
+        cv2.rectangle(image, (x - 12, y - 12), (x + 121, y + 121), (255, 255, 255), -1)
+        image[y:y + 110, x:x + 110] = marker
+        cv2.putText(image, str(index), (10, height - 15), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        return image
+    return frame
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Streams the test pattern as multipart/x-mixed-replace, as IP camera apps do.
+
+    The server's drop_after and stall_after settings misbehave on purpose,
+    so reconnect and stall handling can be tried without a real camera.
+    """
+
+    def do_GET(self):
+        server = self.server
+        send_stream_headers(self)
+        sent = 0
+        start = time.perf_counter()
+        try:
+            while True:
+                if server.drop_after and sent >= server.drop_after:
+                    return  # connection closes: the client sees a dropped stream
+                if server.stall_after and sent == server.stall_after:
+                    time.sleep(server.stall_time)  # connection stays open but goes quiet
+                ok, jpeg = cv2.imencode(".jpg", server.frame(server.next_index()),
+                                        [cv2.IMWRITE_JPEG_QUALITY, server.quality])
+                write_part(self.wfile, jpeg.tobytes())
+                sent += 1
+                delay = start + sent / server.fps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fps=30, quality=80, drop_after=0, stall_after=0, stall_time=10.0):
+        super().__init__(address, StandInHandler)
+        self.frame = test_pattern()
+        self.fps = fps
+        self.quality = quality
+        self.drop_after = drop_after
+        self.stall_after = stall_after
+        self.stall_time = stall_time
+        self.index = 0
+
+    def next_index(self):
+        self.index += 1
+        return self.index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local MJPEG camera stand-in, e.g. for main.py --sources http://127.0.0.1:8080/video")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality")
+    parser.add_argument("--drop-after", type=int, default=0,
+                        help="close each connection after this many frames (0 = never)")
+    parser.add_argument("--stall-after", type=int, default=0,
+                        help="go quiet for --stall-time seconds after this many frames (0 = never)")
+    parser.add_argument("--stall-time", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", args.port), args.fps, args.quality,
+                           args.drop_after, args.stall_after, args.stall_time)
+    print(f"Serving the test pattern at http://127.0.0.1:{args.port}/video")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
@@ -0,0 +1,146 @@
+import functools
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from pipeline import NO_FRAME
+from profiler import LatencyHistogram
+
+
+class StreamStats:
+    """Frames shown, frame rate, capture-to-display age and skipped frames of one stream."""
+
+    def __init__(self):
+        self.age = LatencyHistogram()
+        self.shown = 0
+        self.skipped = 0
+        self.last_seq = None
+        self.first_shown = None
+        self.last_shown = None
+
+    def frame_shown(self, packet, shown_at=None):
+        shown_at = time.time() if shown_at is None else shown_at
+        if self.first_shown is None:
+            self.first_shown = shown_at
+        self.last_shown = shown_at
+        self.shown += 1
+        if packet.get("captured") is not None:
+            self.age.record(shown_at - packet["captured"])
+        seq = packet.get("seq")
+        if seq is not None:
+            if self.last_seq is not None and seq > self.last_seq + 1:
+                # Captured but never processed: the stream was waiting for a worker
+                self.skipped += seq - self.last_seq - 1
+            self.last_seq = seq
+
+    def summary(self):
+        elapsed = (self.last_shown - self.first_shown) if self.shown > 1 else 0.0
+        p50, p95 = (round(v * 1e3, 3) for v in self.age.percentiles((0.5, 0.95)))
+        return {
+            "frames": self.shown,
+            "fps": round((self.shown - 1) / elapsed, 2) if elapsed > 0 else 0.0,
+            "age_ms": {"p50": p50, "p95": p95},
+            "skipped": self.skipped,
+        }
+
+
+class StreamView:
+    """Everything ARCalculator keeps per camera: capture, trackers, sessions and stats.
+
+    Hand and marker trackers carry state from one frame to the next, so each
+    stream gets its own, and its frames are processed one at a time.
+    """
+
+    def __init__(self, index, stream, hand_detector, hand_scheduler, marker_tracker, detector,
+                 profiler, window="AR Calculator"):
+        self.index = index
+        self.stream = stream
+        self.hand_detector = hand_detector
+        self.hand_scheduler = hand_scheduler
+        self.marker_tracker = marker_tracker
+        self.detector = detector
+        self.profiler = profiler
+        self.window = window
+        self.window_created = False
+        self.sessions = {}  # marker id -> CalculatorSession
+        self.stats = StreamStats()
+        self.frame_count = 0
+        self.last_scheduled = 0.0
+        self.ended = False
+
+    def ready(self):
+        # A newer frame is waiting, or the stream has ended and read() will say so
+        stream = self.stream
+        if not hasattr(stream, "ready"):
+            return True  # synchronous sources always have a next frame to read
+        return stream.ready()
+
+
+class StreamScheduler:
+    """Runs the frames of several streams through one worker pool, fairly.
+
+    process(view) runs on a pool thread and returns the finished packet,
+    NO_FRAME when its source had nothing new in time, or None once the
+    stream has ended; show(packet) runs on the calling thread, which owns
+    the windows, and returns None to quit. Work is only submitted
+    for a stream that has a new frame, a stream never has more than one frame
+    in flight, and free workers go to the ready stream that was served longest
+    ago, so a stream with expensive frames cannot starve the others: it just
+    skips more of its own frames. The pool defaults to one thread per core.
+    idle(), if given, runs on the calling thread instead of show() for a
+    NO_FRAME, and when nothing was shown for a while (every stream waiting
+    on its source); it returns None to quit.
+    """
+
+    def __init__(self, views, process, show, workers=None, idle=None):
+        self.views = list(views)
+        self.process = process
+        self.show = show
+        self.idle = idle
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="stream")
+        self.wake = Event()
+        self.finished = deque()  # (view, future) of completed jobs
+        self.in_flight = set()
+        for view in self.views:
+            if hasattr(view.stream, "on_frame"):
+                view.stream.on_frame = self.wake.set
+
+    def _done(self, view, future):
+        self.finished.append((view, future))
+        self.wake.set()
+
+    def _submit_ready(self):
+        ready = [view for view in self.views
+                 if not view.ended and view not in self.in_flight and view.ready()]
+        ready.sort(key=lambda view: view.last_scheduled)
+        for view in ready[:self.workers - len(self.in_flight)]:
+            view.last_scheduled = time.perf_counter()
+            self.in_flight.add(view)
+            future = self.pool.submit(self.process, view)
+            future.add_done_callback(functools.partial(self._done, view))
+
+    def run(self):
+        try:
+            while not all(view.ended for view in self.views):
+                # Woken by a new frame on any stream or a finished job
+                if not self.wake.wait(0.1) and self.idle is not None and self.idle() is None:
+                    return
+                self.wake.clear()
+                while self.finished:
+                    view, future = self.finished.popleft()
+                    self.in_flight.discard(view)
+                    packet = future.result()  # re-raises a failed stage here
+                    if packet is None:
+                        view.ended = True
+                    elif packet is NO_FRAME:
+                        # Source down or reconnecting: nothing to show, but keep the windows responsive
+                        if self.idle is not None and self.idle() is None:
+                            return
+                    elif self.show(packet) is None:
+                        return
+                self._submit_ready()
+        finally:
+            self.pool.shutdown(wait=True)
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+pytest.importorskip("cvzone")
+
+from benchmark import BASELINE, NOISY, compare
+
+FIXTURE = {
+    "machine": "test",
+    "tolerance": 0.3,
+    "metrics": {
+        "draw_ui_us": 1000.0,
+        "evaluate_us": 100.0,
+        "calculate_result_us": 50.0,
+        "loop_threaded_fps": 60.0,
+        "loop_sync_age_ms": 40.0,
+    },
+}
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(FIXTURE))
+    with open(path) as f:
+        stored = json.load(f)
+    return stored["metrics"], stored["tolerance"]
+
+
+def test_unchanged_metrics_pass(baseline, capsys):
+    metrics, tolerance = baseline
+    assert compare(dict(metrics), metrics, tolerance) == []
+    assert "REGRESSION" not in capsys.readouterr().out
+
+
+def test_slower_by_more_than_the_tolerance_regresses(baseline):
+    metrics, tolerance = baseline
+    current = dict(metrics, draw_ui_us=1310.0, evaluate_us=129.0)
+    assert compare(current, metrics, tolerance) == ["draw_ui_us"]
+
+
+def test_fps_regresses_when_it_drops(baseline):
+    metrics, tolerance = baseline
+    assert compare(dict(metrics, loop_threaded_fps=41.0), metrics, tolerance) == ["loop_threaded_fps"]
+    assert compare(dict(metrics, loop_threaded_fps=43.0), metrics, tolerance) == []
+    assert compare(dict(metrics, loop_threaded_fps=500.0), metrics, tolerance) == []
+
+
+def test_faster_is_never_a_regression(baseline):
+    metrics, tolerance = baseline
+    current = {name: value / 10 for name, value in metrics.items() if not name.endswith("_fps")}
+    assert compare(current, metrics, tolerance) == []
+
+
+def test_noisy_metrics_get_twice_the_tolerance(baseline):
+    metrics, tolerance = baseline
+    assert "calculate_result_us" in NOISY and "loop_sync_age_ms" in NOISY
+    assert compare(dict(metrics, calculate_result_us=75.0, loop_sync_age_ms=60.0), metrics, tolerance) == []
+    assert compare(dict(metrics, calculate_result_us=85.0), metrics, tolerance) == ["calculate_result_us"]
+
+
+def test_metrics_missing_from_the_baseline_are_reported_not_failed(baseline, capsys):
+    metrics, tolerance = baseline
+    assert compare(dict(metrics, new_metric_us=1e9), metrics, tolerance) == []
+    assert "new_metric_us" in capsys.readouterr().out
+
+
+def test_stored_baseline_is_well_formed():
+    with open(BASELINE) as f:
+        stored = json.load(f)
+    assert 0 < stored["tolerance"] < 1
+    assert stored["metrics"]
+    assert all(value > 0 for value in stored["metrics"].values())
+    assert set(NOISY) <= set(stored["metrics"])
@@ -0,0 +1,90 @@
+import pytest
+
+from button_layout import DISPLAY, FIRST_KEY, SLIDER, ButtonLayout
+
+LABELS = [
+    ["7", "8", "9", "/"],
+    ["4", "5", "6", "*"],
+    ["1", "2", "3", "-"],
+    ["C", "0", ".", "+"],
+    ["(", ")", "<", "="],
+]
+
+
+def make_layout():
+    # The sizes ARCalculator uses
+    return ButtonLayout(LABELS, 60, 60, 5, 80, 30)
+
+
+def brute_force(layout, x, y):
+    # First visible rectangle in record order that contains the point, edges included
+    for index, button in enumerate(layout.buttons[:len(layout)]):
+        if button["x1"] <= x <= button["x2"] and button["y1"] <= y <= button["y2"]:
+            return index
+    return -1
+
+
+def edge_points(layout):
+    # Every rectangle's corners and edges, one pixel either side, and the gaps between keys
+    for button in layout.buttons[:len(layout)]:
+        for x in (button["x1"] - 1, button["x1"], button["x1"] + 1, button["x2"] - 1, button["x2"],
+                  button["x2"] + 1):
+            for y in (button["y1"] - 1, button["y1"], button["y2"], button["y2"] + 1):
+                yield int(x), int(y)
+
+
+@pytest.mark.parametrize("visibility", [0.0, 0.25, 0.5, 1.0])
+@pytest.mark.parametrize("anchor", [(100, 50), (101, 49), (-40, 300)])
+def test_hit_test_matches_a_rectangle_scan(visibility, anchor):
+    layout = make_layout()
+    layout.update(anchor, visibility)
+    x1, y1 = int(layout.buttons[SLIDER]["x1"]) - layout.total_width - 10, int(layout.buttons[SLIDER]["y1"]) - 10
+    for x in range(x1, int(layout.buttons[SLIDER]["x2"]) + 10, 4):
+        for y in range(y1, int(layout.buttons[SLIDER]["y2"]) + 10, 4):
+            assert layout.hit_test(x, y) == brute_force(layout, x, y), (x, y)
+    for x, y in edge_points(layout):
+        assert layout.hit_test(x, y) == brute_force(layout, x, y), (x, y)
+
+
+def test_hidden_keypad_only_has_the_slider():
+    layout = make_layout()
+    assert layout.hit_test(0, 0) == -1  # not placed yet
+    layout.update((100, 50), 0.0)
+    assert len(layout) == 1
+    x1, y1, x2, y2 = layout.slider_rect
+    assert layout.hit_test(x1, y1) == SLIDER
+    assert layout.hit_test(x2, y2) == SLIDER
+    assert layout.hit_test(x1 - 1, y1) == -1
+    assert layout.hit_test(x1 - 60, y1 + 120) == -1  # where a key would be
+
+
+def test_slider_wins_where_it_overlaps_the_panel():
+    layout = make_layout()
+    layout.update((100, 50), 0.5)
+    x1, y1, x2, y2 = layout.slider_rect
+    point = (x1 + 1, y1 + layout.display_height + 10)
+    assert brute_force(layout, *point) == SLIDER
+    assert layout.hit_test(*point) == SLIDER
+
+
+def test_display_and_keys():
+    layout = make_layout()
+    layout.update((100, 50), 1.0)
+    assert layout.hit_test(110, 60) == DISPLAY
+    first = layout.buttons[FIRST_KEY]
+    assert layout.labels[layout.hit_test(int(first["x1"]), int(first["y1"]))] == "7"
+    last = layout.buttons[-1]
+    assert layout.labels[layout.hit_test(int(last["x2"]) - 1, int(last["y2"]))] == "="
+    # The slider sits on the right edge of the last column and takes precedence there
+    assert layout.hit_test(int(last["x2"]), int(last["y2"])) == SLIDER
+    # The spacing between two keys belongs to neither
+    assert layout.hit_test(int(first["x2"]) + 2, int(first["y1"])) == -1
+
+
+def test_relayout_only_when_the_quantized_anchor_moves():
+    layout = make_layout()
+    assert layout.update((100, 50), 1.0)
+    assert not layout.update((100.6, 50.4), 1.0)
+    assert layout.update((104, 50), 1.0)
+    assert layout.update((104, 50), 0.9)
+    assert layout.relayouts == 3
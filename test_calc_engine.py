@@ -0,0 +1,101 @@
+import random
+import warnings
+
+import pytest
+
+from calc_engine import MAX_BITS, CalcError, LiveEvaluator, compile_expression, evaluate, format_result
+
+KEYS = "0123456789.+-*/()"
+
+CORPUS = [
+    "1+2", "7-10", "2*3+4", "2+3*4", "(2+3)*4", "8/2", "7/2", "1/3", "0.1+0.2", "2.5*4",
+    "10-2-3", "100/10/5", "2*(3+(4-1))*2", "((7))", ".5+1", "3.", "12.75-0.25",
+    "2**10", "2**3**2", "(2**3)**2", "2**-1", "-2**2", "(-2)**2", "4**.5",
+    "7//2", "-7//2", "7.5//2", "1//3*3", "2*3//4",
+    "-5", "+5", "--5", "-(-5)", "-(2+3)*4", "3*-2", "3--2", "2**-2*4", "-.5",
+]
+
+
+def display(text):
+    # What the keypads show for "=": the result, or "Error"
+    try:
+        return format_result(evaluate(text))
+    except CalcError:
+        return "Error"
+
+
+def python_result(text):
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)  # "2(3)" warns before failing
+            value = eval(text, {"__builtins__": {}})
+    except (SyntaxError, ArithmeticError, TypeError, ValueError):
+        return "Error"
+    if not isinstance(value, (int, float, complex)):
+        return "Error"  # e.g. "()" is a tuple to Python
+    if isinstance(value, int) and value.bit_length() > MAX_BITS:
+        return "Error"  # past the engine's size cap
+    return format_result(value)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_matches_python(text):
+    assert display(text) == python_result(text)
+
+
+def test_matches_python_on_random_input():
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(KEYS) for _ in range(rng.randint(1, 8)))
+        if text.count("**") > 1:
+            continue  # Python itself would take forever on 9**9**99
+        assert display(text) == python_result(text), text
+
+
+def test_double_keys_are_one_operator():
+    assert compile_expression("2**3") == (("push", 2), ("push", 3), ("op", "**"))
+    assert compile_expression("7//2") == (("push", 7), ("push", 2), ("op", "//"))
+    assert evaluate("2**3") == 8
+    assert evaluate("7//2") == 3
+    assert display("2***3") == "Error"
+    assert display("7///2") == "Error"
+
+
+def test_unary_minus_and_parentheses():
+    assert evaluate("-2**2") == -4
+    assert evaluate("(-2)**2") == 4
+    assert evaluate("-(3-5)") == 2
+    assert evaluate("2*-(1+1)") == -4
+    assert evaluate("((1+2)*(3+4))") == 21
+
+
+@pytest.mark.parametrize("text", ["1/0", "1//0", "5/(2-2)", "0**-1", "1.5/0"])
+def test_division_by_zero_is_an_error(text):
+    with pytest.raises(CalcError):
+        evaluate(text)
+    assert display(text) == "Error"
+
+
+@pytest.mark.parametrize("text", ["", "+", "2+", "*2", "(1+2", "1+2)", "()", "1..2", "..",
+                                  "01", "2(3)", "(2)3", "1 2", "abc"])
+def test_malformed_input_is_an_error(text):
+    with pytest.raises(CalcError):
+        compile_expression(text)
+    assert display(text) == "Error"
+
+
+def test_size_cap():
+    with pytest.raises(CalcError, match="result too large"):
+        evaluate("9**9**9")
+    with pytest.raises(CalcError, match="result too large"):
+        evaluate("(10**3000)*(10**3000)")
+    assert evaluate("2**100") == 2 ** 100
+
+
+def test_live_preview():
+    live = LiveEvaluator()
+    assert live.preview("2+3*") == "5"
+    assert live.preview("2+3*4") == "14"
+    assert live.preview("2+3") == "5"  # backspace
+    assert live.preview("(1+") == "1"
+    assert live.preview("1/0") == ""
@@ -0,0 +1,78 @@
+import time
+from threading import Thread
+
+import pytest
+
+pytest.importorskip("cvzone")
+
+from frame_source import MJPEGSource
+from main import ARCalculator, WebcamStream
+from pipeline import NO_FRAME
+from standin_camera import StandInServer
+
+CAPTURE_TIMEOUT = 0.1
+
+
+class NoHands:
+    def findHands(self, img, draw=True, flipType=True):
+        return ([], img) if draw else []
+
+
+def serve(port=0, **settings):
+    server = StandInServer(("127.0.0.1", port), fps=100, **settings)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def kill(server):
+    # Open connections close at their next frame and new ones are refused
+    server.drop_after = 1
+    server.shutdown()
+    server.server_close()
+
+
+def timed_capture(calculator):
+    start = time.monotonic()
+    packet = calculator.capture()
+    return packet, time.monotonic() - start
+
+
+def capture_until(calculator, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        packet, elapsed = timed_capture(calculator)
+        assert packet is not None, "the stream ended instead of reconnecting"
+        assert elapsed < CAPTURE_TIMEOUT + 0.4
+        if condition(packet):
+            return packet
+    raise AssertionError("condition not reached in time")
+
+
+def test_reconnects_after_the_camera_dies_and_after_it_stalls():
+    server = serve(stall_after=40, stall_time=5.0)
+    port = server.server_address[1]
+    stream = WebcamStream(MJPEGSource(f"http://127.0.0.1:{port}/video", timeout=0.5), reconnect=True)
+    calculator = ARCalculator(stream, headless=True, hand_detector=NoHands(),
+                              capture_timeout=CAPTURE_TIMEOUT)
+    try:
+        assert capture_until(calculator, lambda packet: packet is not NO_FRAME)["raw"] is not None
+
+        # Killed: the loop keeps getting NO_FRAME on time while the stream retries
+        kill(server)
+        capture_until(calculator, lambda packet: packet is NO_FRAME and not stream.ret)
+        for _ in range(5):
+            packet, elapsed = timed_capture(calculator)
+            assert packet is NO_FRAME
+            assert elapsed < CAPTURE_TIMEOUT + 0.4
+
+        # Back up on the same port: frames resume on a new connection
+        server = serve(port, stall_after=40, stall_time=5.0)
+        capture_until(calculator, lambda packet: packet is not NO_FRAME and stream.reconnects >= 1)
+
+        # Stalled after 40 frames: the connection stays open but goes quiet
+        capture_until(calculator, lambda packet: packet is NO_FRAME)
+        reconnects = stream.reconnects
+        capture_until(calculator, lambda packet: packet is not NO_FRAME and stream.reconnects > reconnects)
+    finally:
+        calculator.shutdown()
+        kill(server)
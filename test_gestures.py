@@ -0,0 +1,134 @@
+import random
+
+import numpy as np
+import pytest
+
+from gestures import GestureEngine, OneEuroFilter
+from hand_utils import make_hand
+
+PALM = 200.0  # wrist to middle knuckle, in pixels
+
+
+def hand(ratio, x=300.0, y=400.0):
+    """An upright hand whose thumb and index tips are ratio palm lengths apart."""
+    points = np.zeros((21, 2))
+    points[:] = (x, y - PALM / 2)
+    points[0] = (x, y)  # wrist
+    points[9] = (x, y - PALM)  # middle knuckle
+    points[8] = (x, y - 1.2 * PALM)  # index tip
+    points[4] = (x + ratio * PALM, y - 1.2 * PALM)  # thumb tip
+    return make_hand(points)
+
+
+def run(script, fps, engine=None):
+    """Feed a ratio(t) script (None = no hand) at fps for its duration; returns (kind, time) events."""
+    engine = engine or GestureEngine()
+    duration, ratio = script
+    events = []
+    for i in range(int(round(duration * fps)) + 1):
+        t = i / fps
+        value = ratio(t)
+        for event in engine.update(None if value is None else hand(value), t):
+            events.append((event.kind, event.timestamp))
+    return events
+
+
+def steps(*segments):
+    """A script that holds each (seconds, ratio) segment in turn."""
+    def ratio(t):
+        for seconds, value in segments:
+            if t < seconds:
+                return value
+            t -= seconds
+        return segments[-1][1]
+    return sum(seconds for seconds, _ in segments), ratio
+
+
+def kinds(events):
+    return [kind for kind, _ in events]
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+def test_press_needs_the_press_ratio_and_release_the_release_ratio(fps):
+    # Default thresholds: press below 0.25, release above 0.35
+    script = steps((0.4, 0.6), (0.4, 0.3), (0.4, 0.15), (0.4, 0.3), (0.4, 0.6))
+    events = run(script, fps, GestureEngine(hold_time=5.0))
+    assert kinds(events) == ["press", "release"]
+    press, release = (t for _, t in events)
+    assert 0.8 <= press < 1.0  # only after reaching 0.15, not at 0.3
+    assert 1.6 <= release < 1.8  # only after opening to 0.6, not at 0.3
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+def test_jitter_between_the_thresholds_is_one_press(fps):
+    rng = random.Random(fps)
+    jitter = {}
+
+    def ratio(t):
+        if t < 0.3:
+            return 0.6
+        if t < 0.6:
+            return 0.1
+        if t < 3.0:
+            # Landmark noise that repeatedly crosses a single 0.3 threshold
+            return jitter.setdefault(t, rng.uniform(0.27, 0.33))
+        return 0.6
+    events = run((3.5, ratio), fps)
+    assert kinds(events) == ["press", "hold", "release"]
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+def test_a_long_pinch_presses_once_then_holds_once(fps):
+    engine = GestureEngine(hold_time=0.5)
+    events = run(steps((0.3, 0.6), (2.0, 0.1), (0.5, 0.6)), fps, engine)
+    assert kinds(events) == ["press", "hold", "release"]
+    press, hold, release = (t for _, t in events)
+    assert hold - press == pytest.approx(0.5, abs=1.0 / fps + 1e-9)
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+def test_each_pinch_is_its_own_press(fps):
+    script = steps(*[(0.3, 0.6), (0.3, 0.1)] * 4 + [(0.3, 0.6)])
+    assert kinds(run(script, fps)) == ["press", "release"] * 4
+
+
+def test_events_do_not_depend_on_the_frame_rate():
+    # The same pinches, with a slow close and a quick one, sampled at two frame rates
+    def ratio(t):
+        if t < 0.5:
+            return 0.6
+        if t < 1.5:
+            return 0.6 - 0.5 * (t - 0.5)  # closes over a second
+        if t < 2.5:
+            return 0.1
+        if t < 2.6:
+            return 0.6
+        if t < 2.7:
+            return 0.1  # quick tap
+        return 0.6
+    slow, fast = run((3.2, ratio), 30), run((3.2, ratio), 60)
+    assert kinds(slow) == kinds(fast) == ["press", "hold", "release", "press", "release"]
+    for (_, t30), (_, t60) in zip(slow, fast):
+        assert t30 == pytest.approx(t60, abs=1.0 / 30 + 1e-9)
+
+
+@pytest.mark.parametrize("fps", [30, 60])
+def test_short_dropouts_keep_the_pinch_and_long_ones_end_it(fps):
+    engine = GestureEngine(max_gap=0.3)
+    events = run(steps((0.3, 0.6), (0.5, 0.1), (0.2, None), (0.5, 0.1), (0.5, None), (0.3, 0.6)), fps, engine)
+    assert kinds(events) == ["press", "hold", "release"]
+    release = events[-1][1]
+    assert 1.8 - 1e-9 <= release < 2.0  # ended by the long dropout, before the open hand returns
+
+
+def test_one_euro_filter_uses_time_not_frames():
+    # A step input reaches the same value after the same time at any frame rate
+    values = {}
+    for fps in (30, 60, 120):
+        f = OneEuroFilter(min_cutoff=1.5, beta=0.0)
+        f.filter([0.0], 0.0)
+        for i in range(1, fps // 5 + 1):
+            value = float(f.filter([1.0], i / fps)[0])
+        values[fps] = value
+    assert values[30] == pytest.approx(values[120], abs=0.05)
+    assert 0.5 < values[60] < 1.0
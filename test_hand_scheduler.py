@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from hand_scheduler import HandScheduler
+from hand_utils import make_hand
+
+FPS = 30.0
+BASE = np.array([[100.0 + 3 * i, 200.0 + 5 * i] for i in range(21)])
+
+
+def hand_at(x, y, hand_type="Right"):
+    return make_hand(BASE + (x, y), hand_type)
+
+
+class ScriptedDetector:
+    """findHands() stand-in that returns scripted hands, one list per inference."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    def findHands(self, img, draw=True, flipType=True):
+        hands = self.script[self.calls] if self.calls < len(self.script) else []
+        self.calls += 1
+        return (hands, img) if draw else hands
+
+
+def tip(hand):
+    return np.asarray(hand["lmList"][8][:2], dtype=float)
+
+
+def feed(scheduler, frames):
+    img = np.zeros((480, 640, 3), np.uint8)
+    return [scheduler.findHands(img, draw=False, timestamp=i / FPS) for i in range(frames)]
+
+
+@pytest.mark.parametrize("interval", [1, 2, 3, 5])
+def test_model_runs_every_interval_frames(interval):
+    detector = ScriptedDetector([[hand_at(0, 0)]] * 100)
+    scheduler = HandScheduler(detector, interval=interval)
+    feed(scheduler, 30)
+    assert detector.calls == scheduler.inferences == -(-30 // interval)
+    assert scheduler.predictions == 30 - scheduler.inferences
+
+
+def test_predicts_at_constant_velocity_between_inferences():
+    # Inferred on frames 0, 3, 6 with the hand moving 9 px per frame to the right
+    speed = 9 * FPS
+    detector = ScriptedDetector([[hand_at(9 * frame, 0)] for frame in (0, 3, 6, 9)])
+    scheduler = HandScheduler(detector, interval=3, smoothing=1.0)
+    results = feed(scheduler, 9)
+    start = tip(hand_at(0, 0))
+    for frame in range(3, 9):
+        # From the first velocity estimate on, predictions land where the hand really is
+        assert tip(results[frame][0]) == pytest.approx(start + (speed * frame / FPS, 0), abs=1.0)
+    assert detector.calls == 3
+
+
+def test_prediction_is_capped_at_max_prediction():
+    detector = ScriptedDetector([[hand_at(0, 0)], [hand_at(30, 0)]])
+    scheduler = HandScheduler(detector, interval=100, smoothing=1.0, max_prediction=0.1)
+    img = np.zeros((10, 10, 3), np.uint8)
+    scheduler.findHands(img, draw=False, timestamp=0.0)
+    scheduler.frames_since_inference = None  # force the second inference
+    scheduler.findHands(img, draw=False, timestamp=0.1)  # 300 px/s
+    late = scheduler.findHands(img, draw=False, timestamp=5.0)
+    assert tip(late[0]) == pytest.approx(tip(hand_at(30, 0)) + (300 * 0.1, 0), abs=1.0)
+
+
+def test_each_hand_keeps_its_own_velocity_when_the_detector_reorders_them():
+    # Left hand moves right, right hand moves down; the detector swaps their order every time
+    script = []
+    for frame in (0, 2, 4):
+        left = hand_at(6 * frame, 0, "Left")
+        right = hand_at(300, 8 * frame, "Right")
+        script.append([left, right] if frame % 4 == 0 else [right, left])
+    detector = ScriptedDetector(script)
+    scheduler = HandScheduler(detector, interval=2, smoothing=1.0)
+    results = feed(scheduler, 4)
+    predicted = {hand["type"]: tip(hand) for hand in results[3]}
+    assert predicted["Left"] == pytest.approx(tip(hand_at(6 * 3, 0)), abs=1.0)
+    assert predicted["Right"] == pytest.approx(tip(hand_at(300, 8 * 3)), abs=1.0)
+
+
+def test_a_new_hand_starts_without_velocity():
+    detector = ScriptedDetector([[], [hand_at(50, 50)]])
+    scheduler = HandScheduler(detector, interval=1)
+    feed(scheduler, 2)
+    assert not scheduler.tracks[0][1].any()
+
+
+def test_adaptive_interval_follows_fingertip_speed():
+    scheduler = HandScheduler(ScriptedDetector([]), interval=1, adaptive=True, max_interval=4)
+    assert scheduler.current_interval() == 1  # nothing tracked yet
+    landmarks = BASE.copy()
+    for speed, expected in ((0, 4), (100, 4), (525, 2), (900, 1), (2000, 1)):
+        velocity = np.zeros_like(landmarks)
+        velocity[8, 0] = speed
+        scheduler.tracks = [[landmarks, velocity, 0.0, "Right"]]
+        assert scheduler.current_interval() == expected, speed
@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+import pytest
+from cv2 import aruco
+
+pytest.importorskip("cvzone")
+
+from benchmark import SyntheticCamera
+from marker_tracker import MarkerTracker
+
+
+def render(camera, index):
+    # SyntheticCamera's frame `index`, without waiting for its capture time, flipped as the app does
+    frame = camera.background.copy()
+    x, y = camera.marker_position(index)
+    size = camera.marker.shape[0]
+    frame[y - 12:y + size + 12, x - 12:x + size + 12] = 255
+    frame[y:y + size, x:x + size] = camera.marker
+    return cv2.flip(frame, 1)
+
+
+def make_detector():
+    return aruco.ArucoDetector(aruco.getPredefinedDictionary(aruco.DICT_4X4_50), aruco.DetectorParameters())
+
+
+def full_scan(detector, frame):
+    corners, ids, _ = detector.detectMarkers(frame)
+    if ids is None:
+        return {}
+    return {int(i): c.reshape(4, 2) for c, i in zip(corners, ids.reshape(-1))}
+
+
+def tracked(result):
+    corners, ids, _ = result
+    if ids is None:
+        return {}
+    return {int(i): c.reshape(4, 2) for c, i in zip(corners, ids.reshape(-1))}
+
+
+class RoiBlind:
+    """Finds markers in the full frame only, so tracking has to live on optical flow."""
+
+    def __init__(self, detector, shape):
+        self.detector = detector
+        self.shape = shape
+        self.roi_calls = 0
+
+    def detectMarkers(self, image):
+        if image.shape[:2] != self.shape:
+            self.roi_calls += 1
+            return (), None, ()
+        return self.detector.detectMarkers(image)
+
+
+def test_roi_redetection_matches_a_full_scan():
+    camera = SyntheticCamera(fps=15)  # larger steps between frames
+    detector = make_detector()
+    tracker = MarkerTracker(make_detector(), marker_ids=(0,), full_scan_interval=1000)
+    for index in range(40):
+        frame = render(camera, index)
+        expected = full_scan(detector, frame)
+        assert set(expected) == {0}
+        got = tracked(tracker.detectMarkers(frame))
+        assert set(got) == {0}
+        np.testing.assert_allclose(got[0], expected[0], atol=1e-3)
+    assert tracker.full_scans == 1  # everything after the first frame came from the ROI
+
+
+def test_optical_flow_follows_the_marker_when_the_roi_misses():
+    camera = SyntheticCamera(fps=15)
+    detector = make_detector()
+    blind = RoiBlind(make_detector(), (camera.height, camera.width))
+    tracker = MarkerTracker(blind, marker_ids=(0,), full_scan_interval=1000)
+    for index in range(30):
+        frame = render(camera, index)
+        got = tracked(tracker.detectMarkers(frame))
+        assert set(got) == {0}
+        np.testing.assert_allclose(got[0], full_scan(detector, frame)[0], atol=1.5)
+    assert tracker.full_scans == 1
+    assert blind.roi_calls == 29
+
+
+def test_periodic_full_scan():
+    camera = SyntheticCamera()
+    tracker = MarkerTracker(make_detector(), marker_ids=(0,), full_scan_interval=10)
+    for index in range(35):
+        tracker.detectMarkers(render(camera, index))
+    assert tracker.full_scans == 4  # frames 0, 10, 20 and 30 (the first tracked frame follows each scan)
+
+
+def test_falls_back_to_a_full_scan_when_the_marker_is_lost():
+    camera = SyntheticCamera()
+    detector = make_detector()
+    tracker = MarkerTracker(make_detector(), marker_ids=(0,), full_scan_interval=1000)
+    tracker.detectMarkers(render(camera, 0))
+    tracker.detectMarkers(render(camera, 1))
+    assert tracker.full_scans == 1
+
+    # A blank frame: flow has nothing to follow and the ROI finds nothing
+    blank = np.full_like(camera.background, 180)
+    assert tracked(tracker.detectMarkers(blank)) == {}
+    assert tracker.full_scans == 2
+
+    # The marker comes back somewhere else; it is found by a full scan right away
+    frame = render(camera, 200)
+    got = tracked(tracker.detectMarkers(frame))
+    np.testing.assert_allclose(got[0], full_scan(detector, frame)[0], atol=1e-3)
+    assert tracker.full_scans == 3
+
+
+def test_only_wanted_ids_are_tracked():
+    camera = SyntheticCamera(marker_id=3)
+    tracker = MarkerTracker(make_detector(), marker_ids=(0, 8))
+    assert tracked(tracker.detectMarkers(render(camera, 0))) == {}
+    assert set(tracked(MarkerTracker(make_detector(), marker_ids=None).detectMarkers(render(camera, 0)))) == {3}
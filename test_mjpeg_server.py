@@ -0,0 +1,40 @@
+import time
+from threading import Thread
+
+import numpy as np
+
+from frame_source import MJPEGSource
+from mjpeg_server import MJPEGServer
+
+
+def test_listens_on_localhost_only_by_default():
+    server = MJPEGServer(0)
+    try:
+        assert server.httpd.server_address[0] == "127.0.0.1"
+        assert server.url.startswith("http://127.0.0.1:")
+    finally:
+        server.close()
+
+
+def test_clients_get_published_frames():
+    server = MJPEGServer(0)
+    frame = np.full((48, 64, 3), 200, np.uint8)
+    stop = False
+
+    def publish():
+        while not stop:
+            server.publish(frame.copy())
+            time.sleep(0.01)
+    publisher = Thread(target=publish, daemon=True)
+    publisher.start()
+    source = MJPEGSource(server.url, timeout=2.0)
+    try:
+        ok, received = source.read()
+        assert ok
+        assert received.shape == frame.shape
+        assert abs(int(received.mean()) - 200) <= 2
+    finally:
+        stop = True
+        source.release()
+        publisher.join(1.0)
+        server.close()
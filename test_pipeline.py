@@ -0,0 +1,151 @@
+import threading
+import time
+
+from pipeline import NO_FRAME, LatestQueue, Pipeline
+
+
+def test_queue_keeps_order():
+    q = LatestQueue(3, drop=True)
+    for i in range(3):
+        assert q.put(i)
+    assert [q.get(), q.get(), q.get()] == [0, 1, 2]
+    assert q.dropped == 0
+
+
+def test_full_queue_drops_oldest():
+    q = LatestQueue(2, drop=True)
+    for i in range(5):
+        q.put(i)
+    assert q.dropped == 3
+    assert [q.get(), q.get()] == [3, 4]
+    assert q.get(timeout=0.01) is None
+
+
+def test_blocking_queue_waits_for_space():
+    q = LatestQueue(1, drop=False)
+    q.put(0)
+    done = []
+    producer = threading.Thread(target=lambda: done.append(q.put(1)))
+    producer.start()
+    producer.join(0.1)
+    assert producer.is_alive()  # waiting, not dropping
+    assert q.get() == 0
+    producer.join(1.0)
+    assert done == [True]
+    assert q.get() == 1
+    assert q.dropped == 0
+
+
+def test_close_wakes_waiting_get_and_put():
+    q = LatestQueue(1, drop=False)
+    got = []
+    consumer = threading.Thread(target=lambda: got.append(q.get()))
+    consumer.start()
+    time.sleep(0.05)
+    q.close()
+    consumer.join(1.0)
+    assert not consumer.is_alive()
+    assert got == [None]
+    assert q.put(1) is False
+
+
+def test_closed_queue_drains_first():
+    q = LatestQueue(2)
+    q.put(1)
+    q.close()
+    assert q.get() == 1
+    assert q.get() is None
+
+
+def counting_source(limit):
+    items = iter(range(limit))
+    return lambda: next(items, None)
+
+
+def test_pipeline_runs_every_item_in_order_without_dropping():
+    shown = []
+    stages = [("source", counting_source(50)), ("double", lambda x: x * 2),
+              ("show", lambda x: shown.append(x) or x)]
+    pipeline = Pipeline(stages, queue_depth=2, drop_frames=False).start()
+    pipeline.join()
+    assert shown == [x * 2 for x in range(50)]
+    assert pipeline.dropped_frames() == {"double": 0, "show": 0}
+
+
+def test_dropping_pipeline_counts_what_it_skips():
+    shown = []
+
+    def slow_show(x):
+        time.sleep(0.01)
+        shown.append(x)
+        return x
+    pipeline = Pipeline([("source", counting_source(200)), ("show", slow_show)]).start()
+    pipeline.join()
+    assert shown == sorted(shown)
+    assert len(shown) + pipeline.dropped_frames()["show"] == 200
+
+
+def test_stop_unblocks_and_joins_every_stage():
+    release = threading.Event()
+    entered = threading.Event()
+
+    def source():
+        time.sleep(0.01)
+        return NO_FRAME  # nothing new, like a camera that is down
+
+    def busy(x):
+        entered.set()
+        release.wait(1.0)
+        return x
+    pipeline = Pipeline([("source", source), ("show", busy)]).start()
+    start = time.monotonic()
+    pipeline.stop()
+    assert time.monotonic() - start < 1.0
+    assert not any(thread.is_alive() for thread in pipeline.threads)
+    assert not entered.is_set()
+
+
+def test_stop_waits_for_a_stage_in_progress():
+    inside = threading.Event()
+    finished = []
+
+    def source():
+        return 1
+
+    def stage(x):
+        inside.set()
+        time.sleep(0.2)
+        finished.append(x)
+        return x
+    pipeline = Pipeline([("source", source), ("stage", stage), ("show", lambda x: x)]).start()
+    inside.wait(1.0)
+    pipeline.stop()
+    # stop() returns only once the stage has let go of its item
+    assert finished
+    assert not any(thread.is_alive() for thread in pipeline.threads)
+
+
+def test_idle_runs_while_nothing_arrives_and_can_stop():
+    calls = []
+
+    def idle():
+        calls.append(1)
+        return None if len(calls) >= 3 else True
+    pipeline = Pipeline([("source", lambda: (time.sleep(0.01), NO_FRAME)[1]), ("show", lambda x: x)],
+                        idle=idle, idle_interval=0.02).start()
+    pipeline.join()
+    assert len(calls) == 3
+    pipeline.stop()
+
+
+def test_failing_stage_is_reported():
+    def broken(x):
+        raise ValueError("boom")
+    pipeline = Pipeline([("source", counting_source(5)), ("broken", broken)]).start()
+    try:
+        pipeline.join()
+    except RuntimeError as e:
+        assert "broken" in str(e)
+        assert isinstance(e.__cause__, ValueError)
+    else:
+        raise AssertionError("the stage error was not raised")
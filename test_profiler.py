@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from profiler import LatencyHistogram
+
+QUANTILES = (0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 0.999, 1.0)
+
+
+def exact(values, q):
+    # The same rank definition the histogram uses: the ceil(q * n)-th smallest value
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_percentiles_are_within_two_percent(seed):
+    rng = np.random.default_rng(seed)
+    # Frame-time-like durations: a few ms with a long tail, down to microseconds
+    seconds = np.concatenate([rng.lognormal(np.log(0.008), 0.5, 20000), rng.uniform(1e-6, 1e-4, 500)])
+    histogram = LatencyHistogram()
+    for value in seconds:
+        histogram.record(value)
+    micros = [int(value * 1e6) for value in seconds]
+    for q, got in zip(QUANTILES, histogram.percentiles(QUANTILES)):
+        want = exact(micros, q) / 1e6
+        # Buckets report their upper edge: never below the true value; a bucket is at most 1/64 wide
+        assert want <= got <= want * (1 + 1 / 64) + 1e-6, q
+    assert histogram.total == len(seconds)
+    assert histogram.max == max(micros)
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for us in range(1, 128):
+        histogram.record(us / 1e6)
+    assert histogram.percentiles([0.5])[0] == pytest.approx(64e-6)
+    assert histogram.percentiles([1.0])[0] == pytest.approx(127e-6)
+
+
+def test_counts_from_several_histograms_merge():
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(1000):
+        (a if i % 3 else b).record(i / 1e4)
+        both.record(i / 1e4)
+    assert a.percentiles(QUANTILES, a.counts + b.counts) == both.percentiles(QUANTILES)
+
+
+def test_empty_reset_and_clamped():
+    histogram = LatencyHistogram(max_seconds=1.0)
+    assert histogram.percentiles([0.5, 0.99]) == [0.0, 0.0]
+    histogram.record(5.0)
+    histogram.record(-1.0)
+    assert histogram.max == 1_000_000
+    assert histogram.percentiles([1.0])[0] == pytest.approx(1.0, rel=1 / 64)
+    assert histogram.percentiles([0.5])[0] == 0.0
+    histogram.reset()
+    assert histogram.total == 0
+    assert histogram.percentiles([0.5]) == [0.0]
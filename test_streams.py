@@ -0,0 +1,73 @@
+import time
+from threading import Lock
+
+from pipeline import NO_FRAME
+from streams import StreamScheduler, StreamStats
+
+
+class ScriptedView:
+    """A stream whose process() results are scripted: packets, NO_FRAME, then None."""
+
+    def __init__(self, index, script):
+        self.index = index
+        self.script = list(script)
+        self.stream = object()  # synchronous: always ready
+        self.ended = False
+        self.last_scheduled = 0.0
+
+    def ready(self):
+        return True
+
+
+def run(views, workers=2, quit_on=None):
+    shown, idled = [], []
+    lock = Lock()
+
+    def process(view):
+        time.sleep(0.001)
+        with lock:
+            return view.script.pop(0) if view.script else None
+
+    def show(packet):
+        assert packet is not NO_FRAME
+        shown.append(packet)
+        return None if packet == quit_on else packet
+
+    def idle():
+        idled.append(1)
+        return True
+    StreamScheduler(views, process, show, workers, idle=idle).run()
+    return shown, idled
+
+
+def test_no_frame_is_never_shown_and_pumps_idle():
+    views = [ScriptedView(0, [{"n": 0}, NO_FRAME, NO_FRAME, {"n": 1}]),
+             ScriptedView(1, [NO_FRAME, {"n": 10}, {"n": 11}])]
+    shown, idled = run(views)
+    assert sorted(packet["n"] for packet in shown) == [0, 1, 10, 11]
+    assert len(idled) >= 3
+    assert all(view.ended for view in views)
+
+
+def test_each_stream_keeps_its_frame_order():
+    views = [ScriptedView(i, [{"stream": i, "n": n} for n in range(20)]) for i in range(3)]
+    shown, _ = run(views, workers=2)
+    for i in range(3):
+        assert [p["n"] for p in shown if p["stream"] == i] == list(range(20))
+
+
+def test_show_returning_none_quits():
+    views = [ScriptedView(0, [{"n": n} for n in range(100)])]
+    shown, _ = run(views, workers=1, quit_on={"n": 5})
+    assert shown[-1] == {"n": 5}
+
+
+def test_stats_count_skipped_frames():
+    stats = StreamStats()
+    for seq, shown_at in ((1, 10.0), (2, 10.1), (5, 10.2)):
+        stats.frame_shown({"seq": seq, "captured": shown_at - 0.05}, shown_at)
+    summary = stats.summary()
+    assert summary["frames"] == 3
+    assert summary["skipped"] == 2
+    assert summary["fps"] == 10.0
+    assert abs(summary["age_ms"]["p50"] - 50) < 2
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cvzone")
+
+from main import WebcamStream
+
+
+class SteppedSource:
+    """Fills each frame with its number; while paced, reads one frame per release of steps."""
+
+    def __init__(self):
+        self.stream = None
+        self.paced = True
+        self.count = 0
+        self.steps = threading.Semaphore(0)
+        self.overwrites = []  # slots written while the reader held them or could be handed them
+
+    def read(self, image=None):
+        if image is None:
+            image = np.zeros((4, 4), np.uint8)
+        else:
+            if self.paced:
+                self.steps.acquire()
+            for name in ("held_index", "write_index"):
+                index = getattr(self.stream, name)
+                if index is not None and self.stream.ring[index] is image:
+                    self.overwrites.append(name)
+        self.count += 1
+        image[:] = self.count % 256
+        return True, image
+
+    def release(self):
+        pass
+
+
+@pytest.mark.parametrize("buffers", [1, 2, 3, 4])
+def test_capture_never_writes_a_slot_the_reader_can_see(buffers):
+    source = SteppedSource()
+    stream = source.stream = WebcamStream(source, buffers=buffers, reconnect=False)
+    assert len(stream.ring) >= 3
+    stream.start()
+    try:
+        for step in range(20):
+            source.steps.release()
+            ret, frame = stream.read(timeout=1.0)
+            assert ret
+            value = frame[0, 0]
+            # Let the capture thread lap the ring while this frame is held
+            for _ in range(len(stream.ring) + 1):
+                source.steps.release()
+            target = 1 + (len(stream.ring) + 2) * (step + 1)  # the first frame comes from __init__
+            deadline = time.monotonic() + 1.0
+            while source.count < target and time.monotonic() < deadline:
+                time.sleep(0.001)
+            assert source.count == target
+            assert (frame == value).all()
+        assert source.overwrites == []
+    finally:
+        source.paced = False  # stop pacing the capture thread so stop() can join it
+        source.steps.release()
+        stream.stop()
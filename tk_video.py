@@ -0,0 +1,113 @@
+import tkinter as tk
+from threading import Lock, Thread
+
+import cv2
+import numpy as np
+
+
+class VideoLabel(tk.Label):
+    """Tk label that shows BGR frames through one PhotoImage updated in place.
+
+    The frame is resized and converted straight into a preallocated binary
+    PPM buffer, which Tk parses without going through PIL, so nothing but the
+    final bytes object is allocated per frame. Colour conversion runs at
+    whichever of the two sizes is smaller.
+
+    Frames from other threads go through submit(): only the newest waiting
+    frame is kept, and a <<FrameReady>> event wakes the Tk loop once, so the
+    display runs at the camera's rate instead of on a polling timer.
+    prepare, if given, is called on the Tk thread with each frame before it
+    is drawn and returns the frame to draw.
+    """
+
+    def __init__(self, master, width, height, prepare=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.size = (width, height)
+        self.prepare = prepare
+        self.photo = tk.PhotoImage(master=master, width=width, height=height)
+        self.configure(image=self.photo)
+        header = f"P6 {width} {height} 255\n".encode("ascii")
+        self.buffer = bytearray(len(header) + width * height * 3)
+        self.buffer[:len(header)] = header
+        self.rgb = np.frombuffer(self.buffer, np.uint8, offset=len(header)).reshape(height, width, 3)
+        self.lock = Lock()
+        self.pending = None
+        self.scheduled = False
+        self.frames_shown = 0
+        self.frames_skipped = 0
+        self.bind("<<FrameReady>>", self._on_frame_ready)
+
+    def show(self, frame):
+        """Draw a BGR frame now; call on the Tk thread."""
+        height, width = frame.shape[:2]
+        if (width, height) == self.size:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        elif width * height > self.size[0] * self.size[1]:
+            cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA),
+                         cv2.COLOR_BGR2RGB, dst=self.rgb)
+        else:
+            cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), self.size, dst=self.rgb,
+                       interpolation=cv2.INTER_LINEAR)
+        # Tk accepts bytes but not bytearray, so this is the one copy per frame
+        self.photo.configure(data=bytes(self.buffer), format="PPM")
+        self.frames_shown += 1
+
+    def submit(self, frame):
+        """Hand over a frame from any thread; frames not yet drawn are replaced."""
+        with self.lock:
+            if self.pending is not None:
+                self.frames_skipped += 1
+            self.pending = frame
+            if self.scheduled:
+                return
+            self.scheduled = True
+        try:
+            self.event_generate("<<FrameReady>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # Window closed, or mainloop() not running yet; let the next frame try again
+            with self.lock:
+                self.scheduled = False
+
+    def _on_frame_ready(self, event=None):
+        with self.lock:
+            frame, self.pending = self.pending, None
+            self.scheduled = False
+        if frame is None:
+            return
+        if self.prepare is not None:
+            frame = self.prepare(frame)
+        self.show(frame)
+
+
+class FrameFeed:
+    """Reads a capture on a daemon thread and passes every frame to callback.
+
+    The thread owns the capture and releases it when it stops, so stop()
+    never closes the device under a read in progress.
+    """
+
+    def __init__(self, capture, callback):
+        self.capture = capture
+        self.callback = callback
+        self.stopped = False
+        self.thread = Thread(target=self._run, name="frame feed", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped:
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+            if not self.stopped:
+                self.callback(frame)
+        self.capture.release()
+
+    def stop(self):
+        self.stopped = True
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        elif self.thread.ident is None:
+            self.capture.release()  # never started
@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+from threading import Lock
+
+from profiler import LatencyHistogram
+
+
+class FrameTracer:
+    """Per-frame spans from capture to display, written as a Chrome/Perfetto trace.
+
+    Every packet carries the sequence number and capture time it got from the
+    camera thread. Stage spans and instant events (such as button presses)
+    are tagged with that sequence number, and frame_shown() measures how old
+    the frame is when it reaches the screen and counts sequence numbers that
+    were skipped (dropped) or shown again (duplicated). The trace opens in
+    chrome://tracing or ui.perfetto.dev.
+    """
+
+    def __init__(self, path, max_events=500000):
+        self.path = path
+        self.max_events = max_events
+        self.events = []
+        self.threads = {}  # thread id -> name, for the trace's track labels
+        self.lock = Lock()
+        self.pid = os.getpid()
+        self.frame_age = LatencyHistogram()
+        self.press_latency = LatencyHistogram()
+        self.last_seq = {}  # stream index -> last sequence number shown
+        self.shown = 0
+        self.dropped = 0
+        self.duplicated = 0
+
+    def _add(self, event):
+        with self.lock:
+            if event.get("tid") is not None and event["tid"] not in self.threads:
+                self.threads[event["tid"]] = threading.current_thread().name
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+
+    def span(self, name, start, end, packet=None):
+        """Record a completed span; times are time.time() seconds."""
+        args = {} if packet is None else {"seq": packet.get("seq")}
+        self._add({"name": name, "ph": "X", "ts": start * 1e6, "dur": (end - start) * 1e6,
+                   "pid": self.pid, "tid": threading.get_ident(), "args": args})
+
+    def instant(self, name, packet=None, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        args = {} if packet is None else {"seq": packet.get("seq")}
+        self._add({"name": name, "ph": "i", "s": "t", "ts": timestamp * 1e6,
+                   "pid": self.pid, "tid": threading.get_ident(), "args": args})
+
+    def wrap(self, name, fn):
+        """fn, timed as a span named name and tagged with the packet it takes or returns."""
+        def traced(*args):
+            start = time.time()
+            result = fn(*args)
+            packet = result if result is not None else (args[0] if args else None)
+            # capture(view) takes a stream view, not a packet
+            self.span(name, start, time.time(), packet if isinstance(packet, dict) else None)
+            return result
+        return traced
+
+    def frame_shown(self, packet, shown_at=None):
+        """Account for a frame that has just been displayed."""
+        shown_at = time.time() if shown_at is None else shown_at
+        captured = packet.get("captured")
+        if captured is None:
+            return
+        age = shown_at - captured
+        seq = packet.get("seq")
+        stream = packet.get("stream", 0)
+        with self.lock:
+            self.frame_age.record(age)
+            for _ in packet.get("presses", ()):
+                # The finger was where it pressed when this frame was captured
+                self.press_latency.record(age)
+            last_seq = self.last_seq.get(stream)
+            if seq is not None and last_seq is not None:
+                if seq <= last_seq:
+                    self.duplicated += 1
+                elif seq > last_seq + 1:
+                    self.dropped += seq - last_seq - 1
+            if seq is not None:
+                self.last_seq[stream] = seq
+            self.shown += 1
+        self._add({"name": "frame age (ms)", "ph": "C", "ts": shown_at * 1e6, "pid": self.pid,
+                   "args": {"age": round(age * 1e3, 3)}})
+        # The capture-to-display span of this frame on its stream's own track (0, -1, -2, ...)
+        self._add({"name": f"frame {seq}", "ph": "X", "ts": captured * 1e6, "dur": age * 1e6,
+                   "pid": self.pid, "tid": -stream, "args": {"seq": seq, "stream": stream}})
+
+    def summary(self):
+        quantiles = (0.5, 0.95, 0.99)
+        with self.lock:
+            age = [round(v * 1e3, 3) for v in self.frame_age.percentiles(quantiles)]
+            press = [round(v * 1e3, 3) for v in self.press_latency.percentiles(quantiles)]
+            return {
+                "frames_shown": self.shown,
+                "frames_dropped": self.dropped,
+                "frames_duplicated": self.duplicated,
+                "frame_age_ms": dict(zip(("p50", "p95", "p99"), age)),
+                "press_to_display_ms": dict(zip(("p50", "p95", "p99"), press)),
+                "presses": self.press_latency.total,
+            }
+
+    def close(self):
+        summary = self.summary()
+        with self.lock:
+            events = list(self.events)
+            names = dict(self.threads)
+            streams = list(self.last_seq) or [0]
+        for stream in streams:
+            names[-stream] = "frames (capture to display)" if stream == 0 else f"frames, stream {stream}"
+        events += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                   for tid, name in names.items()]
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary}, f)
+        return summary
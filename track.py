@@ -1,63 +1,72 @@
 import cv2
-import mediapipe as mp
 import tkinter as tk
-from PIL import Image, ImageTk
+from threading import Thread
+from hand_worker import HandInferenceWorker
+from pipeline import LatestQueue
+from tk_video import FrameFeed, VideoLabel
 
 
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+WIDTH, HEIGHT = 640, 480
 
 
-cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+def track_hands(hands, frame):
+    """Process hand tracking on a new frame; returns it annotated, with the index fingertip."""
+    frame = cv2.flip(frame, 1)
 
+    index_finger_x, index_finger_y = 0, 0
 
-root = tk.Tk()
-root.title("Hand Tracking GUI")
-root.geometry("800x600")
+    for hand in hands.findHands(frame, draw=True)[0]:
+        index_finger_x, index_finger_y = hand["lmList"][8][:2]
 
+    return frame, (index_finger_x, index_finger_y)
 
-video_label = tk.Label(root)
-video_label.pack()
 
+def main():
+    # Mediapipe runs in a worker process; frames go over shared memory
+    hands = HandInferenceWorker(max_hands=2, detection_con=0.7, track_con=0.7)
 
-coord_label = tk.Label(root, text="Index Finger: (x, y)", font=("Arial", 16))
-coord_label.pack()
+    cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
 
-def update_frame():
-    """Capture video frame, process hand tracking, and update the GUI."""
-    ret, frame = cap.read()
-    if not ret:
-        return
-    
-    frame = cv2.flip(frame, 1) 
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb_frame)
-    
-    index_finger_x, index_finger_y = 0, 0  
+    root = tk.Tk()
+    root.title("Hand Tracking GUI")
+    root.geometry("800x600")
 
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-            index_finger_x = int(hand_landmarks.landmark[8].x * frame.shape[1])
-            index_finger_y = int(hand_landmarks.landmark[8].y * frame.shape[0])
+    coord_label = tk.Label(root, text="Index Finger: (x, y)", font=("Arial", 16))
 
-    img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-    imgtk = ImageTk.PhotoImage(image=img)
+    def tracking_worker():
+        """Runs the hand model off the Tk thread, always on the newest camera frame."""
+        while True:
+            frame = frames.get()
+            if frame is None:
+                break  # mailbox closed
+            video_label.submit(track_hands(hands, frame))
 
- 
-    video_label.imgtk = imgtk
-    video_label.configure(image=imgtk)
-    coord_label.config(text=f"Index Finger: ({index_finger_x}, {index_finger_y})")
+    def show_result(result):
+        # Runs on the Tk thread: only the label text and the blit
+        frame, (index_finger_x, index_finger_y) = result
+        coord_label.config(text=f"Index Finger: ({index_finger_x}, {index_finger_y})")
+        return frame
 
-    root.after(10, update_frame)
+    # One PhotoImage updated in place; redrawn when a result arrives instead of on a timer
+    video_label = VideoLabel(root, WIDTH, HEIGHT, prepare=show_result)
+    video_label.pack()
+    coord_label.pack()
 
+    # Latest-wins mailbox: frames the tracker has no time for are dropped, not queued
+    frames = LatestQueue(1, drop=True)
+    feed = FrameFeed(cap, frames.put).start()
+    tracker = Thread(target=tracking_worker, name="hand tracking", daemon=True)
+    tracker.start()
 
-update_frame()
+    root.mainloop()
 
+    frames.close()
+    feed.stop()
+    tracker.join(timeout=1.0)
+    hands.close()
+    cv2.destroyAllWindows()
 
-root.mainloop()
 
-
-cap.release()
-cv2.destroyAllWindows()
+# Guarded, because the hand worker process imports this module
+if __name__ == "__main__":
+    main()
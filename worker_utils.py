@@ -0,0 +1,17 @@
+import multiprocessing
+import signal
+
+
+def worker_context():
+    """multiprocessing context for the calculator's worker processes.
+
+    forkserver forks workers from a clean server, so restarts are cheap and
+    never inherit the camera/UI threads; Windows only has spawn.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def ignore_interrupts():
+    # Ctrl+C goes to the whole process group; the parent decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)